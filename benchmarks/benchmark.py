@@ -0,0 +1,299 @@
+"""
+Offline benchmark of the scrapers and the save paths.
+
+The pages in benchmarks/fixtures are served by a local HTTP server, the scrapers are
+pointed at it and run in a temporary working directory, so neither the live sites nor the
+json/ics files of the repository are touched. Synthetic archives of growing size show how
+the JSON merge and the calendar update scale.
+
+The fixtures are synthetic: hand-written pages with the markup the scrapers read, filled with
+events of the repository's json files and placeholder content ("Fighter 0 vs Fighter 1", menu
+sections) to get a realistic page size. They are not recordings of the live sites, so timings of
+the parsing stages are indicative only.
+
+Usage:
+    python benchmarks/benchmark.py [--sizes 1000,10000] [--repeat 3] [--selenium] [--json results.json]
+
+--selenium renders the glory pages in chrome (pointed at the local server) instead of fetching them via HTTP.
+"""
+import argparse
+import functools
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timezone, timedelta
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+fixtures_dir = os.path.join(repo_dir, "benchmarks", "fixtures")
+
+
+class FixtureHandler(SimpleHTTPRequestHandler):
+    """
+    Serves the fixtures, paths without extension are mapped to the .html page.
+    """
+    def translate_path(self, path):
+        file_path = super().translate_path(path)
+        if os.path.isfile(file_path + ".html"):
+            return file_path + ".html"
+        return file_path
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(FixtureHandler, directory=fixtures_dir))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def reset_workspace(main):
+    """
+    Removes everything a run wrote to the working directory and resets the metrics.
+    """
+    if main.event_store is not None:
+        main.event_store.close()
+        main.event_store = None
+    for path in ("json", "ics", "changes", ".cache"):
+        shutil.rmtree(path, ignore_errors=True)
+    main.change_feed.clear()
+    main.page_cache.clear()
+    main.stage_timings.clear()
+    main.counters.clear()
+
+
+def measure(main, name, run, setup=None, repeat=3):
+    """
+    Runs `setup` and `run` `repeat` times on a fresh workspace and keeps the fastest run.
+    `run` gets the result of `setup` and returns the number of processed events.
+    The peak memory is measured in an additional run with tracemalloc.
+    """
+    best = None
+    for _ in range(repeat):
+        reset_workspace(main)
+        arg = setup() if setup else None
+        main.stage_timings.clear()
+        start = time.perf_counter()
+        events = run(arg)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best["seconds"]:
+            stages = {stage: timing["total"] for stage, timing in main.stage_timings.items()}
+            best = {"case": name, "seconds": elapsed, "events": events, "stages": stages}
+
+    reset_workspace(main)
+    arg = setup() if setup else None
+    tracemalloc.start()
+    run(arg)
+    best["peak_mib"] = tracemalloc.get_traced_memory()[1] / 2**20
+    tracemalloc.stop()
+    best["events_per_sec"] = best["events"] / best["seconds"] if best["seconds"] else 0
+    return best
+
+
+def make_synthetic_events(main, size, modified=0):
+    """
+    Builds `size` upcoming events spread over several years, the first `modified` events get another title.
+    """
+    now = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    events = []
+    for i in range(size):
+        start = now + timedelta(hours=6 * i + 1)
+        events.append(main.CombatEvent(
+            url=f"https://example.com/events/synthetic-{i}",
+            organization="synthetic",
+            title=f"Synthetic {i}: Fighter {2 * i} vs Fighter {2 * i + 1}" + (" (rescheduled)" if i < modified else ""),
+            date=start - timedelta(hours=2),
+            description=f"Event {i} of the synthetic benchmark archive",
+            broadcast=["triller_tv"],
+            venue=f"Arena {i % 97}, City {i % 13}",
+            category="mma",
+            main_card=main.Card(start, start + timedelta(hours=3)),
+            prelims=main.Card(start - timedelta(hours=2), start),
+            last_updated=now.isoformat() + "Z",
+        ))
+    return events
+
+
+def bench_scrapers(main, base_url, repeat):
+    """
+    Runs every scraper against the local server, including saving and the calendar update.
+    """
+    urls = {
+        "ufc": (base_url + "/ufc", base_url + "/ufc/events"),
+        "glory": (base_url + "/glory", base_url + "/glory/events"),
+    }
+    for name, (base_domain, scrape_domain) in urls.items():
+        scraper = main.organisations[name]["scraper"]
+        scraper.config = dict(scraper.config, base_domain=base_domain, scrape_domain=scrape_domain)
+    main.organisations["one"]["scraper"].ical_file = base_url + "/one/events.ics"
+
+    def run(org_data):
+        events = org_data["scrape_function"]()
+        if org_data["scraper"].generates_calendar:
+            main.update_calendar(events, org_data["ical_file"], org_data["ical_name"])
+        return len(events)
+
+    return [measure(main, f"scrape {name}", run, setup=lambda data=org_data: data, repeat=repeat)
+            for name, org_data in main.organisations.items()]
+
+
+def bench_html(main, repeat):
+    """
+    Parses the fixture pages into a full html.parser tree, as the scrapers used to, and with
+    `parse_html` and the strainers of the scrapers.
+    """
+    glory = main.organisations["glory"]["scraper"]
+    ufc = main.organisations["ufc"]["scraper"]
+    strainers = {
+        "glory/events.html": glory.listing_strainer,
+        "glory/events/": glory.event_strainer,
+        "ufc/events.html": ufc.listing_strainer,
+        "ufc/event/": ufc.detail_strainer,
+    }
+    pages = []
+    for root, _, files in os.walk(fixtures_dir):
+        for file in sorted(files):
+            if file.endswith(".html"):
+                path = os.path.relpath(os.path.join(root, file), fixtures_dir).replace(os.sep, "/")
+                strainer = next(strainer for prefix, strainer in strainers.items() if path.startswith(prefix))
+                pages.append((open(os.path.join(root, file), encoding="utf-8").read(), strainer))
+
+    def full(_):
+        for markup, _ in pages:
+            main.BeautifulSoup(markup, "html.parser")
+        return len(pages)
+
+    def strained(_):
+        for markup, strainer in pages:
+            main.parse_html(markup, strainer)
+        return len(pages)
+
+    return [
+        measure(main, f"html full tree ({len(pages)} pages)", full, repeat=repeat),
+        measure(main, f"html {main.html_parser} strained ({len(pages)} pages)", strained, repeat=repeat),
+    ]
+
+
+def bench_dates(main, repeat):
+    """
+    Parses the date strings of the fixtures, with an empty (cold) and a filled (warm) cache.
+    """
+    cet = {"TIMEZONE": "CET", "TO_TIMEZONE": "UTC"}
+    values = []
+    for event in make_synthetic_events(main, 2000):
+        start = event.main_card.start
+        values.append((str(int(start.timestamp())), None))
+        values.append((f"{start.day} {start:%B %Y %H:%M}", cet))
+    # strings only dateparser understands, to show the cost of the fallback
+    fallback_values = [(f"{event.main_card.start:%B} {event.main_card.start.day}th at 8pm", cet)
+                       for event in make_synthetic_events(main, 50)]
+
+    def parse(values):
+        for value, settings in values:
+            main.parse_datetime(value, settings=settings)
+        return len(values)
+
+    def cold(values):
+        main.parse_datetime_cached.cache_clear()
+        return values
+
+    def warm(values):
+        main.parse_datetime_cached.cache_clear()
+        parse(values)
+        return values
+
+    return [
+        measure(main, f"dates cold ({len(values)} values)", parse, setup=lambda: cold(values), repeat=repeat),
+        measure(main, f"dates warm ({len(values)} values)", parse, setup=lambda: warm(values), repeat=repeat),
+        measure(main, f"dates fallback ({len(fallback_values)} values)", parse, setup=lambda: cold(fallback_values), repeat=repeat),
+    ]
+
+
+def bench_archive(main, size, repeat):
+    """
+    JSON merge and calendar update of a synthetic archive of `size` events: building it from scratch,
+    saving it unchanged and saving it with 1% changed events.
+    """
+    events = make_synthetic_events(main, size)
+    changed = make_synthetic_events(main, size, modified=max(1, size // 100))
+
+    def save(batch):
+        main.save_events(batch, "synthetic.json", detect_removed=True)
+        return len(batch)
+
+    def update(batch):
+        main.update_calendar(batch, "synthetic.ics", "Synthetic Events")
+        return len(batch)
+
+    def saved(batch):
+        save(events)
+        return batch
+
+    def calendar(batch):
+        update(events)
+        return batch
+
+    return [
+        measure(main, f"json merge {size} new", save, setup=lambda: events, repeat=repeat),
+        measure(main, f"json merge {size} unchanged", save, setup=lambda: saved(events), repeat=repeat),
+        measure(main, f"json merge {size} 1% changed", save, setup=lambda: saved(changed), repeat=repeat),
+        measure(main, f"ics {size} new", update, setup=lambda: events, repeat=repeat),
+        measure(main, f"ics {size} unchanged", update, setup=lambda: calendar(events), repeat=repeat),
+        measure(main, f"ics {size} 1% changed", update, setup=lambda: calendar(changed), repeat=repeat),
+    ]
+
+
+def print_results(results):
+    print(f"{'case':<36} {'seconds':>9} {'events':>7} {'events/s':>10} {'peak MiB':>9}")
+    for result in results:
+        print(f"{result['case']:<36} {result['seconds']:>9.4f} {result['events']:>7} {result['events_per_sec']:>10.0f} {result['peak_mib']:>9.2f}")
+        for stage, seconds in sorted(result["stages"].items(), key=lambda item: -item[1]):
+            print(f"    {stage:<32} {seconds:>9.4f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark of the scrapers and the save paths.")
+    parser.add_argument("--sizes", default="1000,10000", help="comma separated sizes of the synthetic archives")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per case, the fastest one is reported")
+    parser.add_argument("--selenium", action="store_true", help="render the glory pages in chrome")
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args()
+
+    json_path = os.path.abspath(args.json) if args.json else None
+    # main.py uses paths relative to the working directory and reads its settings on import
+    workdir = tempfile.mkdtemp(prefix="scraper-benchmark-")
+    os.environ["HTTP_CACHE"] = "0"
+    os.environ["GLORY_FAST_MODE"] = "0" if args.selenium else "1"
+    os.environ.pop("METRICS_TEXTFILE", None)
+    os.chdir(workdir)
+    sys.path.insert(0, repo_dir)
+    import main as scraper_main
+
+    server, base_url = start_server()
+    try:
+        results = bench_scrapers(scraper_main, base_url, args.repeat)
+        results += bench_html(scraper_main, args.repeat)
+        results += bench_dates(scraper_main, args.repeat)
+        for size in (int(size) for size in args.sizes.split(",")):
+            results += bench_archive(scraper_main, size, args.repeat)
+    finally:
+        server.shutdown()
+        reset_workspace(scraper_main)
+        scraper_main.driver_pool.shutdown()
+        os.chdir(repo_dir)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print_results(results)
+    if json_path:
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
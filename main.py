@@ -2,23 +2,24 @@ import logging
 from logging.handlers import RotatingFileHandler
 
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 
 from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
+from selenium.common.exceptions import WebDriverException, SessionNotCreatedException
 
 import time
 import locale
 import re
 import json
 from collections import defaultdict
+from dataclasses import dataclass, field
 
-import dateparser
 from datetime import datetime, timezone, timedelta
+from zoneinfo import ZoneInfo
+from functools import lru_cache
+import functools
 
 from ics import Calendar, Event
 from ics.grammar.parse import ContentLine
@@ -26,7 +27,27 @@ import os
 
 import subprocess
 import glob
+import threading
+import hashlib
+import codecs
+import gzip
+import sqlite3
+import bisect
+from concurrent.futures import ThreadPoolExecutor
+import atexit
+import signal
+import random
+import argparse
+import uuid
+import email.utils
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+from contextlib import contextmanager
 from dotenv import load_dotenv
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
 #######################################################################################
 
@@ -52,14 +73,578 @@ logger.addHandler(handler)
 load_dotenv()
 token = os.getenv("GITHUB_TOKEN")
 repo_url = f"https://{token}@github.com/LeanderWernst/combat-sports-events.git"
+# Published directories, the working copy is limited to them (and the files in the root) if GIT_SPARSE is set
+PUBLISHED_PATHS = ["ics", "json", "changes", "api"]
+git_branch = os.getenv("GIT_BRANCH")
+# GIT_DEPTH and GIT_SPARSE rewrite the checkout the scraper runs in (shallow history, only PUBLISHED_PATHS checked out),
+# so they are meant for a dedicated publishing clone and disabled by default
+# history fetched when syncing, 0 runs a plain git pull with the full history
+git_depth = int(os.getenv("GIT_DEPTH", 0))
+git_sparse = os.getenv("GIT_SPARSE", "0") == "1"
+git_push_retries = int(os.getenv("GIT_PUSH_RETRIES", 3))
+# runs within this many seconds after the last automatic commit amend it instead of adding a new one, 0 disables squashing
+git_squash_window = int(os.getenv("GIT_SQUASH_WINDOW", 0))
+GIT_COMMIT_MESSAGE = "AUTO: update ics and json files"
+
+## METRICS
+# Timings and counters of a run, written to the run report (and optionally a Prometheus textfile) at the end
+run_report_file = "log/run_report.json"
+metrics_textfile = os.getenv("METRICS_TEXTFILE")
+stage_timings = defaultdict(lambda: {"count": 0, "total": 0.0, "max": 0.0})
+counters = defaultdict(int)
+metrics_lock = threading.Lock()
+
+@contextmanager
+def timed(stage):
+    """
+    Context manager, which adds the runtime of the block to the timings of `stage`.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        with metrics_lock:
+            timing = stage_timings[stage]
+            timing["count"] += 1
+            timing["total"] += elapsed
+            timing["max"] = max(timing["max"], elapsed)
+
+def timed_stage(stage):
+    """
+    Decorator version of `timed`.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timed(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def count(name, value=1):
+    with metrics_lock:
+        counters[name] += value
+
+def reset_metrics():
+    with metrics_lock:
+        stage_timings.clear()
+        counters.clear()
+
+## SCHEDULER
+# Number of organisations scraped at the same time and the maximum runtime (seconds) of a single pipeline
+scrape_concurrency = int(os.getenv("SCRAPE_CONCURRENCY", 3))
+scrape_timeout = int(os.getenv("SCRAPE_TIMEOUT", 600))
+# seconds publishing waits for pipelines abandoned after their timeout, before their files are left out of the commit
+scrape_abandon_wait = int(os.getenv("SCRAPE_ABANDON_WAIT", 30))
+# pipelines abandoned after their timeout, which may still be running: org name -> thread
+abandoned_pipelines = {}
+
+## DAEMON
+# Poll intervals of the daemon mode in seconds, depending on how close the next event of an organisation is
+daemon_min_interval = int(os.getenv("DAEMON_MIN_INTERVAL", 10 * 60))
+daemon_max_interval = int(os.getenv("DAEMON_MAX_INTERVAL", 12 * 3600))
+# random deviation of every interval, as fraction of the interval
+daemon_jitter = float(os.getenv("DAEMON_JITTER", 0.1))
+# (seconds until the next event, poll interval), the first matching step is used
+POLL_STEPS = [
+    (24 * 3600, daemon_min_interval),
+    (3 * 24 * 3600, 3600),
+    (14 * 24 * 3600, 3 * 3600),
+]
+
+## HTTP
+# One keep-alive session shared by all scrapers, so connections are reused between requests.
+# Responses with an ETag or Last-Modified header are cached on disk and revalidated with conditional requests.
+http_pool_size = int(os.getenv("HTTP_POOL_SIZE", 10))
+http_cache_dir = ".cache/http"
+http_cache_enabled = os.getenv("HTTP_CACHE", "1") == "1"
+http_session = requests.Session()
+http_adapter = requests.adapters.HTTPAdapter(pool_connections=http_pool_size, pool_maxsize=http_pool_size)
+http_session.mount("https://", http_adapter)
+http_session.mount("http://", http_adapter)
+
+class HttpResponse:
+    """
+    Response of `http_get`. `not_modified` is True if the server answered with 304
+    and the body was taken from the cache, so callers can skip parsing.
+    Streamed responses read their body only through `iter_chunks`/`iter_lines`.
+    Responses fetched with `defer_cache` are only stored in the cache by `commit_cache`.
+    """
+    def __init__(self, url, status_code, content, encoding=None, not_modified=False, stream=None, cache_meta=None, defer_cache=False):
+        self.url = url
+        self.status_code = status_code
+        self._content = content
+        self.encoding = encoding
+        self.not_modified = not_modified
+        self._stream = stream
+        self._cache_meta = cache_meta
+        self._cache_body = None
+        self.defer_cache = defer_cache
+
+    @property
+    def content(self):
+        if self._content is None:
+            self._content = b"".join(self.iter_chunks())
+        return self._content
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding or "utf-8", errors="replace")
+
+    def iter_chunks(self, chunk_size=64 * 1024):
+        if self._stream is None:
+            yield self._content
+            return
+        stream, self._stream = self._stream, None
+        chunks = stream.iter_content(chunk_size=chunk_size)
+        if not self._cache_meta:
+            yield from chunks
+            return
+        tmp_path = get_http_cache_tmp_path(self.url)
+        yield from write_http_cache_body(tmp_path, chunks)
+        # only a completely read body is cached
+        self._cache_body = tmp_path
+        if not self.defer_cache:
+            self.commit_cache()
+
+    def commit_cache(self):
+        """
+        Stores the response in the cache, so the next request for the url is conditional.
+        Streamed responses are only stored if their body was read completely.
+        """
+        if not self._cache_meta:
+            return
+        if self._cache_body is None:
+            if self._content is None:
+                return
+            self._cache_body = get_http_cache_tmp_path(self.url)
+            for _ in write_http_cache_body(self._cache_body, [self._content]):
+                pass
+        write_http_cache(self.url, self._cache_meta, self._cache_body)
+        self._cache_meta = self._cache_body = None
+
+    def iter_lines(self, chunk_size=64 * 1024):
+        decoder = codecs.getincrementaldecoder(self.encoding or "utf-8")(errors="replace")
+        pending = ""
+        for chunk in self.iter_chunks(chunk_size):
+            pending += decoder.decode(chunk)
+            lines = pending.split("\n")
+            pending = lines.pop()
+            for line in lines:
+                yield line.rstrip("\r")
+        pending += decoder.decode(b"", final=True)
+        if pending:
+            yield pending.rstrip("\r")
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Error for url: {self.url}")
+
+def get_http_cache_paths(url):
+    key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+    return os.path.join(http_cache_dir, key + ".json"), os.path.join(http_cache_dir, key + ".body")
+
+def read_http_cache_meta(url):
+    meta_path, _ = get_http_cache_paths(url)
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def read_http_cache_body(url):
+    _, body_path = get_http_cache_paths(url)
+    try:
+        with open(body_path, "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+def get_http_cache_meta(url, response, encoding):
+    meta = {
+        "url": url,
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        "encoding": encoding,
+    }
+    return meta if meta["etag"] or meta["last_modified"] else None
+
+def get_http_cache_tmp_path(url):
+    _, body_path = get_http_cache_paths(url)
+    return f"{body_path}.{threading.get_ident()}.tmp"
+
+def write_http_cache_body(tmp_path, chunks):
+    """
+    Writes `chunks` to a temporary body file while yielding them, see `write_http_cache`.
+    """
+    os.makedirs(http_cache_dir, exist_ok=True)
+    with open(tmp_path, "wb") as f:
+        for chunk in chunks:
+            f.write(chunk)
+            yield chunk
+
+def write_http_cache(url, meta, tmp_path):
+    """
+    Stores the cache entry of `url` with the body written to `tmp_path`. The body is only
+    moved in place once it is complete, so interrupted streams leave no partial entry.
+    """
+    meta_path, body_path = get_http_cache_paths(url)
+    os.replace(tmp_path, body_path)
+    tmp_path = f"{meta_path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, meta_path)
+
+def http_get(url, headers=None, cookies=None, timeout=30, conditional=True, stream=False, defer_cache=False):
+    """
+    GET request through the shared session with conditional request caching.
+
+    Args:
+        url (str): URL to fetch
+        headers (dict): Request headers
+        cookies (dict): Request cookies
+        timeout (float): Timeout in seconds
+        conditional (bool): Send If-None-Match/If-Modified-Since for cached responses
+        stream (bool): Don't load the body into memory, read it with `iter_chunks`/`iter_lines`
+        defer_cache (bool): Don't cache the response until `commit_cache` is called, e.g. once its events are saved
+
+    Returns:
+        HttpResponse: Response, `not_modified` is set if the cached body is still valid
+    """
+    request_headers = dict(headers or {})
+    meta = read_http_cache_meta(url) if http_cache_enabled and conditional else None
+    if meta:
+        if meta.get("etag"):
+            request_headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            request_headers["If-Modified-Since"] = meta["last_modified"]
+
+    with timed("http.get"):
+        response = http_session.get(url, headers=request_headers, cookies=cookies, timeout=timeout, stream=stream)
+    count("http.requests")
+    if response.status_code == 304 and meta:
+        body = read_http_cache_body(url)
+        if body is not None:
+            count("http.not_modified")
+            return HttpResponse(url, 200, body, meta.get("encoding"), not_modified=True)
+        # cache body is gone, fetch unconditionally
+        return http_get(url, headers, cookies, timeout, conditional=False, stream=stream, defer_cache=defer_cache)
+
+    cache_meta = None
+    if http_cache_enabled and response.status_code == 200:
+        cache_meta = get_http_cache_meta(url, response, response.encoding or (None if stream else response.apparent_encoding))
+    if stream:
+        return HttpResponse(url, response.status_code, None, response.encoding, stream=response, cache_meta=cache_meta, defer_cache=defer_cache)
+
+    result = HttpResponse(url, response.status_code, response.content, response.encoding or response.apparent_encoding,
+                          cache_meta=cache_meta, defer_cache=defer_cache)
+    if not defer_cache:
+        result.commit_cache()
+    return result
+
+## PAGE CACHE
+# Events extracted from detail pages, keyed by URL together with a hash of the parsed page content.
+# Unchanged pages are not parsed again and pages of past events are not fetched at all.
+page_cache_path = ".cache/pages.json"
+page_cache_enabled = os.getenv("PAGE_CACHE", "1") == "1"
+# fetch and parse past events again, e.g. after changing a parser
+page_cache_refresh = os.getenv("PAGE_CACHE_REFRESH", "0") == "1"
+page_cache_ttl = int(os.getenv("PAGE_CACHE_TTL", 7 * 24 * 3600))
+page_cache_size = int(os.getenv("PAGE_CACHE_SIZE", 5000))
+
+class PageCache:
+    """
+    On-disk cache of the data extracted from event detail pages.
+
+    Entries of upcoming events are reused while the hash of the page content is unchanged and
+    they are younger than `ttl` seconds. Entries of past events are frozen: they are reused without
+    fetching the page, unless `refresh` is set. At most `max_size` entries are kept, the least
+    recently used ones are evicted on `save`.
+    """
+    def __init__(self, path, ttl, max_size, enabled=True, refresh=False):
+        self.path = path
+        self.ttl = ttl
+        self.max_size = max_size
+        self.enabled = enabled
+        self.refresh = refresh
+        self._entries = None
+        self._lock = threading.Lock()
+
+    @property
+    def entries(self):
+        if self._entries is None:
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError):
+                self._entries = {}
+        return self._entries
+
+    def is_frozen(self, entry):
+        date = parse_iso(entry["date"])
+        if date is None:
+            return False
+        return as_aware(date) < datetime.now(timezone.utc)
+
+    def get_frozen(self, url):
+        """
+        Returns the cached data of a past event, None if the page has to be fetched.
+        """
+        if not self.enabled or self.refresh:
+            return None
+        with self._lock:
+            entry = self.entries.get(url)
+            if entry is None or not self.is_frozen(entry):
+                return None
+            entry["used"] = time.time()
+        count("page_cache.frozen")
+        return entry["data"]
+
+    def get(self, url, content_hash):
+        """
+        Returns the cached data of a page, None if it changed or the entry expired.
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self.entries.get(url)
+            if entry is None or entry["hash"] != content_hash or time.time() - entry["stored"] > self.ttl:
+                count("page_cache.misses")
+                return None
+            entry["used"] = time.time()
+        count("page_cache.hits")
+        return entry["data"]
+
+    def put(self, url, content_hash, data, date):
+        if not self.enabled:
+            return
+        now = time.time()
+        with self._lock:
+            self.entries[url] = {"hash": content_hash, "date": date, "stored": now, "used": now, "data": data}
+
+    def save(self):
+        if not self.enabled or self._entries is None:
+            return
+        with self._lock:
+            if len(self._entries) > self.max_size:
+                urls = sorted(self._entries, key=lambda url: self._entries[url]["used"])
+                for url in urls[:len(self._entries) - self.max_size]:
+                    del self._entries[url]
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+
+    def clear(self):
+        with self._lock:
+            self._entries = {}
+
+def get_page_hash(soup):
+    """
+    Hash of a parsed page, which only covers the nodes kept by the strainer it was parsed with.
+    """
+    return hashlib.sha256(str(soup).encode("utf-8")).hexdigest()
+
+page_cache = PageCache(page_cache_path, page_cache_ttl, page_cache_size, enabled=page_cache_enabled, refresh=page_cache_refresh)
+
+## EVENT STORE
+# SQLite database the json files in /json are exported from, it is rebuilt from the json files if missing
+event_store_path = os.getenv("EVENT_STORE", ".cache/events.sqlite3")
+EVENT_STORE_VERSION = 3
+event_store = None
+event_store_lock = threading.Lock()
+
+## CHANGE FEED
+# Changes of a run are appended to changes/changelog.jsonl, changes/latest.json only contains the last run
+changes_dir = "changes"
+# urls of upcoming events reported as removed, per file. Published, so a rebuilt event store doesn't report them again.
+removed_state_path = os.path.join(changes_dir, "removed.json")
+change_feed = []
+change_feed_lock = threading.Lock()
+
+## STATIC API
+# Minified bundles for the front end in /api: upcoming.json, seasons/{year}.json and indexes per organization and category,
+# each with precompressed .gz (and .br, if brotli is installed) siblings. manifest.json lists the content hashes for cache busting.
+api_dir = "api"
+API_VERSION = 1
+
+## CALENDARS
+# Sidecar indexes of the calendars in /ics, mapping URL#card to the position and content hash of its VEVENT block
+calendar_index_dir = ".cache/ics"
+# Feed server for filtered calendars, e.g. /feed.ics?org=ufc,glory&card=main_card
+feed_host = os.getenv("FEED_HOST", "127.0.0.1")
+feed_port = int(os.getenv("FEED_PORT", 8080))
+# seconds between checks of the json files for new data
+feed_reload_interval = int(os.getenv("FEED_RELOAD_INTERVAL", 60))
+# number of rendered feeds kept in memory
+feed_cache_size = int(os.getenv("FEED_CACHE_SIZE", 256))
+FEED_FILTERS = {"org": "organization", "category": "category", "card": "card"}
 
 ## SELENIUM WEBDRIVER
-options = webdriver.ChromeOptions()
-options.add_argument("--headless")
-options.add_argument("--disable-gpu")
-options.add_argument("--no-sandbox")
-options.add_argument("--disable-dev-shm-usage")
-driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+# Browsers are only started on first use. The chromedriver path is cached on disk, so
+# ChromeDriverManager only resolves (and downloads) a driver when the cached one is missing or broken.
+driver_cache_file = ".cache/chromedriver_path"
+driver_pool_size = int(os.getenv("DRIVER_POOL_SIZE", 2))
+# Number of webdrivers fetching glory event pages in parallel, limited by the pool size
+glory_workers = int(os.getenv("GLORY_WORKERS", driver_pool_size))
+# Fetch glory pages via plain HTTP first and only render pages in chrome where that is not sufficient
+glory_fast_mode = os.getenv("GLORY_FAST_MODE", "1") == "1"
+# Lean render profile: don't load images, fonts, media and trackers and return from `get` once the DOM is ready
+chrome_lean_mode = os.getenv("CHROME_LEAN", "1") == "1"
+# URL patterns blocked in the lean profile, extended by the comma separated CHROME_BLOCKED_URLS
+BLOCKED_URL_PATTERNS = [
+    # images
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico",
+    # fonts
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    # media
+    "*.mp4", "*.webm", "*.m3u8", "*.mp3",
+    # trackers
+    "*googletagmanager.com*", "*google-analytics.com*", "*doubleclick.net*", "*connect.facebook.net*",
+    "*hotjar.com*", "*tiktok.com*", "*snap.licdn.com*", "*cookiebot.com*",
+] + [pattern.strip() for pattern in os.getenv("CHROME_BLOCKED_URLS", "").split(",") if pattern.strip()]
+
+def get_chrome_options():
+    options = webdriver.ChromeOptions()
+    options.add_argument("--headless")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    if chrome_lean_mode:
+        options.page_load_strategy = "eager"
+        options.add_argument("--blink-settings=imagesEnabled=false")
+        options.add_argument("--mute-audio")
+        options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+    return options
+
+def apply_lean_profile(driver):
+    """
+    Blocks the requests of `BLOCKED_URL_PATTERNS` in the browser via the DevTools protocol.
+    """
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+    return driver
+
+def get_driver_path(refresh=False):
+    """
+    Returns the path of the chromedriver binary, resolving it with ChromeDriverManager
+    only if there is no cached path yet or `refresh` is set.
+    """
+    if not refresh and os.path.exists(driver_cache_file):
+        with open(driver_cache_file, "r", encoding="utf-8") as f:
+            path = f.read().strip()
+        if path and os.path.exists(path):
+            return path
+
+    from webdriver_manager.chrome import ChromeDriverManager
+    path = ChromeDriverManager().install()
+    os.makedirs(os.path.dirname(driver_cache_file), exist_ok=True)
+    with open(driver_cache_file, "w", encoding="utf-8") as f:
+        f.write(path)
+    return path
+
+def create_driver():
+    try:
+        driver = webdriver.Chrome(service=Service(get_driver_path()), options=get_chrome_options())
+    except SessionNotCreatedException:
+        # cached driver does not match the installed chrome anymore
+        logger.info("Cached chromedriver is outdated, resolving a new one...")
+        driver = webdriver.Chrome(service=Service(get_driver_path(refresh=True)), options=get_chrome_options())
+    if chrome_lean_mode:
+        try:
+            apply_lean_profile(driver)
+        except WebDriverException as e:
+            logger.info(f"Blocking of resources not available: {e}")
+    return driver
+
+def render_page(driver, url, condition, timeout=10):
+    """
+    Loads `url` and waits until `condition` is met, instead of waiting for the complete page load.
+    Logs the time until the page was loaded and until it was ready.
+
+    Returns:
+        The result of `condition`
+    """
+    from selenium.webdriver.support.ui import WebDriverWait
+    start = time.perf_counter()
+    driver.get(url)
+    loaded = time.perf_counter() - start
+    result = WebDriverWait(driver, timeout).until(condition)
+    ready = time.perf_counter() - start
+    count("selenium.pages")
+    logger.info(f"Rendered {url} in {ready:.2f}s (loaded after {loaded:.2f}s)")
+    return result
+
+class DriverPool:
+    """
+    Pool of lazily started Chrome drivers, which scrapers lease and return.
+    At most `max_size` drivers exist at the same time, `lease()` blocks until one is free.
+    """
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._idle = []
+        self._drivers = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._closed = False
+
+    def acquire(self):
+        self._slots.acquire()
+        with self._lock:
+            if self._closed:
+                self._slots.release()
+                raise RuntimeError("Driver pool is already shut down.")
+            if self._idle:
+                return self._idle.pop()
+        try:
+            driver = create_driver()
+        except Exception:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._drivers.append(driver)
+        return driver
+
+    def release(self, driver, discard=False):
+        with self._lock:
+            if discard or self._closed:
+                if driver in self._drivers:
+                    self._drivers.remove(driver)
+                quit_driver(driver)
+            else:
+                self._idle.append(driver)
+        self._slots.release()
+
+    @contextmanager
+    def lease(self):
+        driver = self.acquire()
+        discard = False
+        try:
+            yield driver
+        except WebDriverException:
+            # browser might be in a broken state, don't hand it out again
+            discard = True
+            raise
+        finally:
+            self.release(driver, discard=discard)
+
+    def shutdown(self):
+        with self._lock:
+            self._closed = True
+            drivers, self._drivers, self._idle = self._drivers, [], []
+        for driver in drivers:
+            quit_driver(driver)
+
+def quit_driver(driver):
+    try:
+        driver.quit()
+    except Exception as e:
+        logger.error(f"Error while quitting webdriver: {e}")
+
+driver_pool = DriverPool(driver_pool_size)
+atexit.register(driver_pool.shutdown)
 
 #######################################################################################
 
@@ -74,99 +659,556 @@ CATEGORY = {
     "BJJ": "bjj"
 }
 
-def scrape_glory():
-    config = {
-        "headers": {
-            "Accept-Language": "en",
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/114.0.0.0 Safari/537.36",
-        },
-        "duration": 3,
-        "base_domain": "https://glorykickboxing.com",
-        "scrape_domain": "https://glorykickboxing.com/events"
-    }
+## DATE PARSING
+# dateparser is slow, so strict parsers for the formats we know are tried first and results are memoized.
+# dateparser itself is only imported for strings the strict parsers don't understand, it takes long to import as well.
+date_cache_size = int(os.getenv("DATE_CACHE_SIZE", 4096))
+date_parse_stats = defaultdict(int)
+date_parse_stats_lock = threading.Lock()
+
+# event page dates like "7 December 2024 19:00" or "Saturday, Dec 7, 2024 7:00 PM", matched in one pass
+# instead of trying strptime formats one after another
+DATETIME_PATTERN = re.compile(
+    r"(?:(?P<weekday>[a-z]+),? )?"
+    r"(?:(?P<day>\d{1,2}) (?P<month>[a-z]+)|(?P<month_first>[a-z]+) (?P<day_second>\d{1,2}),?) (?P<year>\d{4}) "
+    r"(?P<hour>\d{1,2})(?::(?P<minute>\d{2}))? ?(?P<meridiem>[ap]m)?",
+    re.IGNORECASE
+)
+MONTHS = {
+    name: number for number, month in enumerate(["january", "february", "march", "april", "may", "june", "july",
+                                                  "august", "september", "october", "november", "december"], 1)
+    for name in (month, month[:3])
+}
+WEEKDAYS = {name for day in ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"] for name in (day, day[:3])}
 
-    events = []
+# fixed offsets, as used by dateparser for abbreviations in the parsed string
+TIMEZONE_ABBREVIATIONS = {
+    "UTC": 0, "GMT": 0, "WET": 0, "BST": 1, "CET": 1, "CEST": 2, "EET": 2, "EEST": 3,
+    "EST": -5, "EDT": -4, "CST": -6, "CDT": -5, "MST": -7, "MDT": -6, "PST": -8, "PDT": -7,
+}
+
+def count_date_parse(path):
+    with date_parse_stats_lock:
+        date_parse_stats[path] += 1
+
+def get_date_parse_stats():
+    """
+    Returns how often each parsing path was used, including memo hits.
+    """
+    cache_info = parse_datetime_cached.cache_info()
+    with date_parse_stats_lock:
+        stats = dict(date_parse_stats)
+    stats["memo_hits"] = cache_info.hits
+    stats["memo_size"] = cache_info.currsize
+    return stats
+
+def parse_datetime(value, settings=None):
+    """
+    Drop-in replacement for `dateparser.parse` for the date strings of our scrapers.
+
+    Epoch timestamps, ISO 8601 and the known event page formats are parsed with strict parsers,
+    everything else is handed to dateparser. Only the `TIMEZONE` and `TO_TIMEZONE` settings are
+    supported by the fast paths, other settings always use dateparser. Epoch timestamps are
+    returned as aware datetimes in UTC (or `TO_TIMEZONE`).
 
-    try:       
-        driver.get(config["scrape_domain"])
-        WebDriverWait(driver, 10).until(
-            lambda d: d.execute_script("return document.readyState") == "complete"
+    Args:
+        value (str): Date string
+        settings (dict): dateparser settings
+
+    Returns:
+        datetime: Parsed datetime or None
+    """
+    if value is None:
+        return None
+    return parse_datetime_cached(" ".join(str(value).split()), tuple(sorted((settings or {}).items())))
+
+@lru_cache(maxsize=date_cache_size)
+def parse_datetime_cached(value, settings):
+    settings_dict = dict(settings)
+    if set(settings_dict) - {"TIMEZONE", "TO_TIMEZONE"}:
+        import dateparser
+        count_date_parse("dateparser")
+        with timed("date.dateparser"):
+            return dateparser.parse(value, settings=settings_dict)
+
+    try:
+        parsed = parse_datetime_strict(value)
+        from_tz = ZoneInfo(settings_dict["TIMEZONE"]) if "TIMEZONE" in settings_dict else None
+        to_tz = ZoneInfo(settings_dict["TO_TIMEZONE"]) if "TO_TIMEZONE" in settings_dict else None
+    except Exception:
+        parsed = None
+    if parsed is None:
+        import dateparser
+        count_date_parse("dateparser")
+        with timed("date.dateparser"):
+            return dateparser.parse(value, settings=settings_dict or None)
+
+    path, parsed = parsed
+    count_date_parse(path)
+    if path == "epoch":
+        return parsed.astimezone(to_tz) if to_tz else parsed
+    if parsed.tzinfo is None:
+        # naive datetimes are interpreted in TIMEZONE and returned naive, like dateparser does
+        if from_tz and to_tz:
+            return parsed.replace(tzinfo=from_tz).astimezone(to_tz).replace(tzinfo=None)
+        return parsed
+    return parsed.astimezone(to_tz) if to_tz else parsed
+
+def parse_datetime_strict(value):
+    """
+    Returns a tuple of the used parsing path and the datetime, or None if no strict parser matches.
+    """
+    if re.fullmatch(r"\d{9,11}", value):
+        return "epoch", datetime.fromtimestamp(int(value), tz=timezone.utc)
+
+    if re.match(r"\d{4}-\d{2}-\d{2}", value):
+        try:
+            return "iso", datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+
+    tzinfo = None
+    parts = value.rsplit(" ", 1)
+    if len(parts) == 2 and parts[1].upper() in TIMEZONE_ABBREVIATIONS:
+        value = parts[0]
+        tzinfo = timezone(timedelta(hours=TIMEZONE_ABBREVIATIONS[parts[1].upper()]))
+
+    match = DATETIME_PATTERN.fullmatch(value)
+    if not match or (match["weekday"] and match["weekday"].lower() not in WEEKDAYS):
+        return None
+    month = MONTHS.get((match["month"] or match["month_first"]).lower())
+    hour = int(match["hour"])
+    if month is None or not (match["minute"] or match["meridiem"]):
+        return None
+    if match["meridiem"]:
+        if not 1 <= hour <= 12:
+            return None
+        hour = hour % 12 + (12 if match["meridiem"].lower() == "pm" else 0)
+    try:
+        parsed = datetime(int(match["year"]), month, int(match["day"] or match["day_second"]), hour, int(match["minute"] or 0), tzinfo=tzinfo)
+    except ValueError:
+        return None
+    return "format", parsed
+
+## EVENT MODEL
+
+def parse_iso(value):
+    return datetime.fromisoformat(value) if value else None
+
+def format_iso(value):
+    return value.isoformat() if value else None
+
+def as_aware(value):
+    # naive datetimes are UTC, the same way the ics library writes them
+    return value.replace(tzinfo=timezone.utc) if value is not None and value.tzinfo is None else value
+
+@dataclass(slots=True)
+class Card:
+    start: datetime = None
+    end: datetime = None
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(parse_iso(data.get("start")), parse_iso(data.get("end")))
+
+    def to_json(self):
+        return {"start": format_iso(self.start), "end": format_iso(self.end)}
+
+@dataclass(slots=True)
+class CombatEvent:
+    """
+    Event of an organisation. Dates are kept as datetimes, `to_json`/`from_json`
+    convert from and to the schema of the json files.
+    """
+    url: str
+    organization: str
+    title: str
+    date: datetime
+    description: object = None
+    broadcast: list = None
+    venue: str = None
+    category: object = None
+    main_card: Card = field(default_factory=Card)
+    prelims: Card = field(default_factory=Card)
+    last_updated: str = None
+
+    @property
+    def year(self):
+        return self.date.year
+
+    @property
+    def day(self):
+        return self.date.date()
+
+    @property
+    def cards(self):
+        return {"main_card": self.main_card, "prelims": self.prelims}
+
+    def sort_key(self):
+        return (as_aware(self.date).timestamp(), self.url)
+
+    @classmethod
+    def from_json(cls, data):
+        cards = data.get("cards") or {}
+        return cls(
+            url=data["url"],
+            organization=data.get("organization"),
+            title=data.get("title"),
+            date=parse_iso(data.get("date")),
+            description=data.get("description"),
+            broadcast=data.get("broadcast"),
+            venue=data.get("venue"),
+            category=data.get("category"),
+            main_card=Card.from_json(cards.get("main_card") or {}),
+            prelims=Card.from_json(cards.get("prelims") or {}),
+            last_updated=data.get("last_updated"),
         )
-        WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, 'a[href^="/events/"]'))
+
+    def to_json(self):
+        return {
+            "url": self.url,
+            "organization": self.organization,
+            "title": self.title,
+            "date": format_iso(self.date),
+            "description": self.description,
+            "broadcast": self.broadcast,
+            "venue": self.venue,
+            "category": self.category,
+            "cards": {
+                "main_card": self.main_card.to_json(),
+                "prelims": self.prelims.to_json()
+            },
+            "last_updated": self.last_updated,
+        }
+
+## SCRAPERS
+# lxml builds the tree considerably faster than the pure python html.parser, which is used if lxml is not installed
+try:
+    import lxml
+    html_parser = os.getenv("HTML_PARSER", "lxml")
+except ImportError:
+    html_parser = os.getenv("HTML_PARSER", "html.parser")
+
+class AnyOfStrainer(SoupStrainer):
+    """
+    SoupStrainer keeping every tag, which is kept by one of `strainers`, together with its subtree.
+    """
+    def __init__(self, *strainers):
+        super().__init__()
+        self.strainers = strainers
+
+    def allow_tag_creation(self, nsprefix, name, attrs):
+        return any(strainer.allow_tag_creation(nsprefix, name, attrs) for strainer in self.strainers)
+
+    def allow_string_creation(self, string):
+        return False
+
+    # beautifulsoup < 4.13
+    def search_tag(self, markup_name=None, markup_attrs={}):
+        return any(strainer.search_tag(markup_name, markup_attrs) for strainer in self.strainers)
+
+def parse_html(markup, parse_only=None):
+    """
+    Parses a page with `html_parser`. If `parse_only` is given, only the matching tags and their
+    subtrees are built, the scrapers pass a strainer covering every node they read.
+    """
+    with timed("html.parse"):
+        return BeautifulSoup(markup, html_parser, parse_only=parse_only)
+
+# Registry of all organisations, filled by `register_scraper`
+organisations = {}
+
+DEFAULT_HEADERS = {
+    "Accept-Language": "en",
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/114.0.0.0 Safari/537.36",
+}
+
+class Scraper:
+    """
+    Base class of the scraper plugins.
+
+    A plugin declares its organisation and defaults as class attributes and implements
+    `fetch` and `parse`. Sorting, saving and the registration in `organisations` are
+    handled here, so every plugin runs through the same pipeline.
+    """
+    name = None             # key in `organisations`
+    organization = None     # "organization" of the events
+    filename = None         # json file in /json/{year}
+    ical_file = None
+    ical_name = None
+    broadcast = []
+    category = None
+    config = {}
+    # the source lists all upcoming events, so missing ones were removed
+    detect_removed = True
+    # False if `ical_file` links an external calendar instead of a calendar generated in /ics
+    generates_calendar = True
+
+    def fetch(self):
+        """
+        Fetches the source of the events, returns None if the source did not change since the last run.
+        A source fetched with `http_get(..., defer_cache=True)` is only cached once its events are saved,
+        so a run failing after the fetch is not skipped as not modified by the next run.
+        """
+        raise NotImplementedError
+
+    def parse(self, source):
+        """
+        Yields the events of the fetched source, built with `make_event`.
+        """
+        raise NotImplementedError
+
+    def make_event(self, url, title, date, description, venue, main_card, prelims=(None, None), **fields):
+        """
+        Builds an event, `main_card` and `prelims` are (start, end) tuples of datetimes.
+        """
+        return CombatEvent(
+            url=url,
+            organization=fields.get("organization", self.organization),
+            title=title,
+            date=date,
+            description=description,
+            broadcast=fields.get("broadcast", self.broadcast),
+            venue=venue,
+            category=fields.get("category", self.category),
+            main_card=Card(*main_card),
+            prelims=Card(*prelims),
+            last_updated=datetime.now(timezone.utc).isoformat() + "Z",
         )
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
+
+    def run(self):
+        # URLs of events which could not be scraped this run, they are not reported as removed
+        self.failed_urls = set()
+        with timed(f"scrape.{self.name}.fetch"):
+            source = self.fetch()
+        if source is None:
+            logger.info(f"{self.ical_name} not modified, skipping.")
+            count(f"scrape.{self.name}.not_modified")
+            return []
+        with timed(f"scrape.{self.name}.parse"):
+            events = sorted(self.parse(source), key=CombatEvent.sort_key, reverse=True)
+        count(f"scrape.{self.name}.events", len(events))
+        page_cache.save()
+        save_events(events, self.filename, detect_removed=self.detect_removed and bool(events), keep_urls=self.failed_urls)
+        # sources with pages that failed to load are fetched again by the next run, instead of being not modified
+        if isinstance(source, HttpResponse) and not self.failed_urls:
+            source.commit_cache()
+        logger.info(f'Success!')
+        return events
+
+def register_scraper(scraper_class):
+    """
+    Class decorator, which adds a scraper plugin to `organisations`.
+    """
+    scraper = scraper_class()
+    organisations[scraper.name] = {
+        "scrape_function": scraper.run,
+        "ical_file": scraper.ical_file,
+        "ical_name": scraper.ical_name,
+        "scraper": scraper
+    }
+    return scraper_class
+
+@register_scraper
+class GloryScraper(Scraper):
+    name = "glory"
+    organization = "glory"
+    filename = "glory.json"
+    ical_file = "glory_events.ics"
+    ical_name = "Glory Events"
+    broadcast = ["triller_tv"]
+    category = "mma"
+    config = {
+        "headers": DEFAULT_HEADERS,
+        "duration": 3,
+        "base_domain": "https://glorykickboxing.com",
+        "scrape_domain": "https://glorykickboxing.com/events",
+        "fast_mode": glory_fast_mode
+    }
+    listing_strainer = SoupStrainer('a', href=re.compile(r'^/events/'))
+    # class values are matched as written in the page, before they are split into single classes
+    event_strainer = AnyOfStrainer(
+        SoupStrainer(['title', 'h3']),
+        SoupStrainer('meta', property="og:description"),
+        SoupStrainer(['span', 'div'], class_=["location-top", "location-large", "info", "large live clock"])
+    )
+
+    def fetch(self):
+        config = self.config
+        soup = self.fetch_listing_http() if config["fast_mode"] else None
+        if soup is None:
+            from selenium.webdriver.support import expected_conditions as EC
+            with driver_pool.lease() as driver, timed("selenium.page"):
+                render_page(driver, config["scrape_domain"], EC.presence_of_element_located((By.CSS_SELECTOR, 'a[href^="/events/"]')))
+                soup = parse_html(driver.page_source, self.listing_strainer)
+        return soup
+
+    def parse(self, soup):
         #event_cards = soup.find_all('div', class_=['card', 'gold', 'event-card'])
         a_event_links = soup.find_all('a', href=re.compile(r'^/events/'))
-        event_links = { link['href'].split('#')[0] for link in a_event_links }
+        event_links = sorted({ link['href'].split('#')[0] for link in a_event_links })
+
+        # past events don't change anymore, they are taken from the page cache
+        events = []
+        for link in list(event_links):
+            cached = page_cache.get_frozen(self.config["base_domain"] + link)
+            if cached is not None:
+                events.append(CombatEvent.from_json(cached))
+                event_links.remove(link)
+
+        if self.config["fast_mode"]:
+            fetched, event_links = self.fetch_events_http(event_links)
+            events += fetched
+            if event_links:
+                logger.info(f"Rendering {len(event_links)} glory events in chrome.")
+        events += self.fetch_events_chrome(event_links)
+        return events
 
-        for link in event_links:
-            driver.get(config["base_domain"] + link)
-            element = WebDriverWait(driver, 10).until(
+    def fetch_listing_http(self):
+        """
+        Fetches the glory event listing without a browser.
+        Returns None if the static html contains no event links.
+        """
+        config = self.config
+        try:
+            response = http_get(config["scrape_domain"], headers=config["headers"], timeout=10)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            logger.info(f"Glory listing not available via http, falling back to chrome: {e}")
+            return None
+        soup = parse_html(response.text, self.listing_strainer)
+        if not soup.select_one('a[href^="/events/"]'):
+            return None
+        return soup
+
+    def fetch_events_http(self, event_links):
+        """
+        Fetches the glory event detail pages via plain HTTP.
+
+        Returns:
+            tuple: List of parsed events and list of links which need to be rendered in chrome,
+                   because the static html does not contain the needed elements.
+        """
+        config = self.config
+        results = {}
+
+        def work(link):
+            try:
+                response = http_get(config["base_domain"] + link, headers=config["headers"], timeout=10)
+                response.raise_for_status()
+            except requests.RequestException:
+                return
+            soup = parse_html(response.text, self.event_strainer)
+            if soup.select_one('div[class="info"]'):
+                has_info_div = True
+            elif soup.select_one('div.large.live.clock'):
+                has_info_div = False
+            else:
+                return
+            try:
+                results[link] = self.parse_event_cached(soup, has_info_div, link)
+            except Exception as e:
+                logger.info(f"Parsing static glory event {link} failed, falling back to chrome: {e}")
+
+        with ThreadPoolExecutor(max_workers=http_pool_size, thread_name_prefix="glory-http") as executor:
+            list(executor.map(work, event_links))
+
+        events = [results[link] for link in event_links if link in results]
+        fallback_links = [link for link in event_links if link not in results]
+        return events, fallback_links
+
+    def fetch_events_chrome(self, event_links, workers=None):
+        """
+        Fetches the glory event detail pages with several webdrivers in parallel.
+        Every worker handles its own share of `event_links`. A failing page is logged and skipped,
+        the remaining events are returned in the order of `event_links`.
+        """
+        if not event_links:
+            return []
+        workers = max(1, min(workers or glory_workers, len(event_links)))
+        shares = [event_links[i::workers] for i in range(workers)]
+        results = {}
+
+        def work(share):
+            try:
+                with driver_pool.lease() as driver:
+                    for link in share:
+                        try:
+                            results[link] = self.fetch_event_chrome(driver, link)
+                        except Exception as e:
+                            logger.error(f"Error scraping glory event {link}: {e}")
+                            self.failed_urls.add(self.config["base_domain"] + link)
+            except Exception as e:
+                logger.error(f"Error starting webdriver for {len(share)} glory events: {e}")
+                self.failed_urls.update(self.config["base_domain"] + link for link in share)
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="glory") as executor:
+            list(executor.map(work, shares))
+
+        return [results[link] for link in event_links if link in results]
+
+    def fetch_event_chrome(self, driver, link):
+        with timed("selenium.page"):
+            element = render_page(driver, self.config["base_domain"] + link,
                 lambda d: d.find_elements(By.CSS_SELECTOR, 'div[class="info"]') or 
                           d.find_elements(By.CSS_SELECTOR, 'div[class="bar longAgo info-bar"]')
             )
-            has_info_div = element[0].get_attribute('class') == "info" if element else False
-
-            soup = BeautifulSoup(driver.page_source, 'html.parser')
-            event_title = soup.find('title').text
-            # event_name = soup.find('meta', property="og:title")["content"]
-            event_description = soup.find('meta', property="og:description")["content"]
-            if has_info_div:
-                location = soup.find('span', class_="location-top").text.strip()
-                div_info = soup.find('div', class_="info")
-                start_main = div_info.find('span').text.strip()
-                date_split = re.split(r'(\d{4})', start_main)
-                date = date_split[0] + " " + date_split[1]
-                start_main_utc = dateparser.parse(start_main, settings={'TIMEZONE': 'CET', 'TO_TIMEZONE': 'UTC'}).isoformat()
-                start_prelims = div_info.find('span', string=re.compile(r'Prelims')).text.strip().replace('Prelims', '') if div_info.find('span', string=re.compile(r'Prelims')) else None
-                start_prelims_utc = dateparser.parse(date + start_prelims, settings={'TIMEZONE': 'CET', 'TO_TIMEZONE': 'UTC'}).isoformat() if start_prelims else None
-                end_main_utc = (dateparser.parse(start_main, settings={'TIMEZONE': 'CET', 'TO_TIMEZONE': 'UTC'}) + timedelta(hours=config["duration"])).isoformat()
-            else:
-                location = soup.find('span', class_="location-large").text.strip()
-                date = soup.find('div', class_="large live clock").find('label').text.strip()
-                h3s_main_card = soup.find_all('h3')
-                start_main = None
-                for h3 in h3s_main_card:
-                    if 'Main' in h3.text.strip():
-                        main_text = h3.text.strip()
-                    elif 'Prelims' in h3.text.strip():
-                        prelims_text = h3.text.strip()
-                start_main = main_text.replace('Main cardLive at ', '')
-                start_main_utc = dateparser.parse(date + " " + start_main, settings={'TIMEZONE': 'CET', 'TO_TIMEZONE': 'UTC'}).isoformat()
-                start_prelims = prelims_text.replace('PrelimsLive at ', '') if prelims_text else None
-                start_prelims_utc = dateparser.parse(date + " " + start_prelims, settings={'TIMEZONE': 'CET', 'TO_TIMEZONE': 'UTC'}).isoformat()
-                end_main_utc = (dateparser.parse(date + " " + start_main, settings={'TIMEZONE': 'CET', 'TO_TIMEZONE': 'UTC'}) + timedelta(hours=config["duration"])).isoformat()
-
-            event =  {
-                "url": config["base_domain"] + link,
-                "organization": "glory",
-                "title": event_title,
-                "date": start_main_utc,
-                "description": event_description,
-                "broadcast": ["triller_tv"],
-                "venue": location,
-                "category": "mma",
-                "cards": {
-                    "main_card": {
-                            "start": start_main_utc,
-                            "end": end_main_utc
-                    },
-                    "prelims": {
-                        "start": start_prelims_utc if start_prelims else None,
-                        "end": start_main_utc if start_prelims else None
-                    }
-                },
-                "last_updated": datetime.now(timezone.utc).isoformat() + "Z",
-            }
-            events.append(event)
-        events = sorted(events, key=lambda event: event["date"], reverse=True)
-        save_events(events, 'glory.json')
-        logger.info(f'Success!')
-        return events
-
-    finally:
-        driver.quit()
+        has_info_div = element[0].get_attribute('class') == "info" if element else False
+        return self.parse_event_cached(parse_html(driver.page_source, self.event_strainer), has_info_div, link)
+
+    def parse_event_cached(self, soup, has_info_div, link):
+        """
+        Returns the event of the page cache if the page did not change, otherwise parses and caches it.
+        """
+        url = self.config["base_domain"] + link
+        content_hash = get_page_hash(soup)
+        cached = page_cache.get(url, content_hash)
+        if cached is not None:
+            return CombatEvent.from_json(cached)
+        event = self.parse_event(soup, has_info_div, link)
+        page_cache.put(url, content_hash, event.to_json(), to_utc_iso(event.date))
+        return event
+
+    def parse_event(self, soup, has_info_div, link):
+        config = self.config
+        event_title = soup.find('title').text
+        # event_name = soup.find('meta', property="og:title")["content"]
+        event_description = soup.find('meta', property="og:description")["content"]
+        if has_info_div:
+            location = soup.find('span', class_="location-top").text.strip()
+            div_info = soup.find('div', class_="info")
+            start_main = div_info.find('span').text.strip()
+            date_split = re.split(r'(\d{4})', start_main)
+            date = date_split[0] + " " + date_split[1]
+            start_main_utc = parse_datetime(start_main, settings={'TIMEZONE': 'CET', 'TO_TIMEZONE': 'UTC'})
+            start_prelims = div_info.find('span', string=re.compile(r'Prelims')).text.strip().replace('Prelims', '') if div_info.find('span', string=re.compile(r'Prelims')) else None
+            start_prelims_utc = parse_datetime(date + start_prelims, settings={'TIMEZONE': 'CET', 'TO_TIMEZONE': 'UTC'}) if start_prelims else None
+            end_main_utc = start_main_utc + timedelta(hours=config["duration"])
+        else:
+            location = soup.find('span', class_="location-large").text.strip()
+            date = soup.find('div', class_="large live clock").find('label').text.strip()
+            h3s_main_card = soup.find_all('h3')
+            start_main = None
+            for h3 in h3s_main_card:
+                if 'Main' in h3.text.strip():
+                    main_text = h3.text.strip()
+                elif 'Prelims' in h3.text.strip():
+                    prelims_text = h3.text.strip()
+            start_main = main_text.replace('Main cardLive at ', '')
+            start_main_utc = parse_datetime(date + " " + start_main, settings={'TIMEZONE': 'CET', 'TO_TIMEZONE': 'UTC'})
+            start_prelims = prelims_text.replace('PrelimsLive at ', '') if prelims_text else None
+            start_prelims_utc = parse_datetime(date + " " + start_prelims, settings={'TIMEZONE': 'CET', 'TO_TIMEZONE': 'UTC'})
+            end_main_utc = start_main_utc + timedelta(hours=config["duration"])
+
+        return self.make_event(
+            url=config["base_domain"] + link,
+            title=event_title,
+            date=start_main_utc,
+            description=event_description,
+            venue=location,
+            main_card=(start_main_utc, end_main_utc),
+            prelims=(start_prelims_utc, start_main_utc) if start_prelims else (None, None)
+        )
 
 """ def scrape_one_championship():
     config = {
@@ -230,91 +1272,470 @@ def scrape_glory():
         print(f"An error occurred: {str(e)}")
         return [] """
 
-def write_events_to_json(events, filename):
+def get_event_store():
     """
-    Saves events in /json/{year} and updates existing.
-    
-    Args:
-        events (list): Liste of events
-        filename (str): Filename without path
+    Returns the connection to the event store, creating the database on first use.
+
+    The store keeps one row per (filename, year, url), mirroring the json files it is exported to.
+    `seq` preserves the order of events within a file and `files` remembers the state of every
+    exported file, so files changed outside the scraper (e.g. by git pull) are re-imported.
+    Stores of an older schema version are dropped and rebuilt from the json files.
     """
-    if not events:
-        logger.info("No events found for saving.")
+    global event_store
+    if event_store is None:
+        os.makedirs(os.path.dirname(event_store_path) or ".", exist_ok=True)
+        conn = sqlite3.connect(event_store_path, check_same_thread=False)
+        if conn.execute("PRAGMA user_version").fetchone()[0] != EVENT_STORE_VERSION:
+            conn.executescript("DROP TABLE IF EXISTS events; DROP TABLE IF EXISTS files;")
+        conn.executescript(f"""
+            CREATE TABLE IF NOT EXISTS events (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                filename TEXT NOT NULL,
+                year INTEGER NOT NULL,
+                url TEXT NOT NULL,
+                organization TEXT,
+                date TEXT,
+                fingerprint TEXT NOT NULL,
+                removed INTEGER NOT NULL DEFAULT 0,
+                data TEXT NOT NULL
+            );
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_events_file_url ON events (filename, year, url);
+            CREATE INDEX IF NOT EXISTS idx_events_url ON events (url);
+            CREATE INDEX IF NOT EXISTS idx_events_org_date ON events (organization, date);
+            CREATE TABLE IF NOT EXISTS files (
+                filename TEXT NOT NULL,
+                year INTEGER NOT NULL,
+                stamp TEXT,
+                PRIMARY KEY (filename, year)
+            );
+            PRAGMA user_version = {EVENT_STORE_VERSION};
+        """)
+        event_store = conn
+    return event_store
+
+def get_event_fingerprint(event):
+    """
+    Hash of all fields of an event except `last_updated`.
+    """
+    content = json.dumps({key: value for key, value in event.items() if key != "last_updated"}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+def get_json_file_path(year, filename):
+    return os.path.join(f"./json/{year}", filename)
+
+def get_file_stamp(file_path):
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+def sync_event_store(conn, year, filename):
+    """
+    (Re-)imports json/{year}/{filename} into the store, if the file changed since the last export.
+    """
+    file_path = get_json_file_path(year, filename)
+    stamp = get_file_stamp(file_path)
+    row = conn.execute("SELECT stamp FROM files WHERE filename = ? AND year = ?", (filename, year)).fetchone()
+    if row and row[0] == stamp:
         return
-    
-    event_year = datetime.fromisoformat(events[0]["date"]).year
-    dir_path = f"./json/{event_year}"
-    file_path = os.path.join(dir_path, filename)
-    
-    os.makedirs(dir_path, exist_ok=True)
-    
+
     existing_events = []
-    if os.path.exists(file_path):
+    if stamp:
         with open(file_path, "r", encoding="utf-8") as file:
             existing_events = json.load(file)
 
-    events_dict = {event["url"]: event for event in existing_events}
+    with conn:
+        # the removed flags are not part of the json files, they are kept from the store and the published state
+        removed_urls = read_removed_state().get(filename, set())
+        removed_urls.update(row[0] for row in conn.execute("SELECT url FROM events WHERE filename = ? AND year = ? AND removed = 1", (filename, year)))
+        conn.execute("DELETE FROM events WHERE filename = ? AND year = ?", (filename, year))
+        conn.executemany("""
+            INSERT INTO events (filename, year, url, organization, date, fingerprint, removed, data) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (filename, year, url) DO UPDATE SET
+                organization = excluded.organization, date = excluded.date, fingerprint = excluded.fingerprint, data = excluded.data
+        """, [(filename, year, event["url"], event.get("organization"), event.get("date"), get_event_fingerprint(event),
+               int(event["url"] in removed_urls), json.dumps(event, ensure_ascii=False))
+              for event in existing_events])
+        conn.execute("INSERT OR REPLACE INTO files (filename, year, stamp) VALUES (?, ?, ?)", (filename, year, stamp))
+
+def get_card_times(event):
+    return {card: dict(times) for card, times in (event.get("cards") or {}).items()}
+
+def make_change(change_type, event, filename, **fields):
+    return {
+        "type": change_type,
+        "url": event["url"],
+        "organization": event.get("organization"),
+        "title": event.get("title"),
+        "date": event.get("date"),
+        "file": filename,
+        **fields
+    }
+
+def upsert_events(conn, events, year, filename):
+    """
+    Merges events into the store, the caller is responsible for the transaction.
+    Existing events only get their existing keys updated. `last_updated` is only taken over
+    if any other field changed, so events are compared by their fingerprint first and
+    unchanged events are not even decoded.
+
+    Returns:
+        list: Changes of added, updated or rescheduled events, see `make_change`
+    """
+    existing = {}
+    changes = []
+    # events reported as removed before, which are back again
+    revived = set()
+    urls = list({event["url"] for event in events})
+    for index in range(0, len(urls), 500):
+        chunk = urls[index:index + 500]
+        rows = conn.execute(f"SELECT url, seq, fingerprint, removed, data FROM events WHERE filename = ? AND year = ? AND url IN ({','.join('?' * len(chunk))})",
+                            (filename, year, *chunk))
+        for url, seq, fingerprint, removed, data in rows.fetchall():
+            existing[url] = (seq, fingerprint, data)
+            if removed:
+                conn.execute("UPDATE events SET removed = 0 WHERE seq = ?", (seq,))
+                revived.add(url)
 
     for new_event in events:
         url = new_event["url"]
-        if url in events_dict:
-            existing_event = events_dict[url]
-            updated = False
-            for key, value in new_event.items():
-                if key in existing_event and existing_event[key] != value:
-                    existing_event[key] = value
-                    updated = True
-            if updated:
-                logger.info(f"Event updated: {url}")
+        fingerprint = get_event_fingerprint(new_event)
+        if url in existing:
+            seq, existing_fingerprint, data = existing[url]
+            if existing_fingerprint == fingerprint and url not in revived:
+                continue
+            existing_event = json.loads(data) if isinstance(data, str) else data
+            change = None
+            if existing_fingerprint != fingerprint:
+                old_cards = get_card_times(existing_event)
+                updated_fields = []
+                for key, value in new_event.items():
+                    if key != "last_updated" and key in existing_event and existing_event[key] != value:
+                        existing_event[key] = value
+                        updated_fields.append(key)
+                if updated_fields:
+                    if "last_updated" in existing_event and "last_updated" in new_event:
+                        existing_event["last_updated"] = new_event["last_updated"]
+                    existing_fingerprint = get_event_fingerprint(existing_event)
+                    conn.execute("UPDATE events SET organization = ?, date = ?, fingerprint = ?, data = ? WHERE seq = ?",
+                                 (existing_event.get("organization"), existing_event.get("date"), existing_fingerprint,
+                                  json.dumps(existing_event, ensure_ascii=False), seq))
+                    logger.info(f"Event updated: {url}")
+                    new_cards = get_card_times(existing_event)
+                    if new_cards != old_cards:
+                        change = make_change("rescheduled", existing_event, filename, fields=updated_fields, old=old_cards, new=new_cards)
+                    else:
+                        change = make_change("updated", existing_event, filename, fields=updated_fields)
+            if url in revived:
+                # an event, which was reported as removed, is back: reported once as added with the merged times
+                revived.discard(url)
+                change = make_change("added", existing_event, filename, new=get_card_times(existing_event))
+            if change:
+                changes.append(change)
+            existing[url] = (seq, existing_fingerprint, existing_event)
         else:
-            events_dict[url] = new_event
+            cursor = conn.execute("INSERT INTO events (filename, year, url, organization, date, fingerprint, data) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                  (filename, year, url, new_event.get("organization"), new_event.get("date"), fingerprint, json.dumps(new_event, ensure_ascii=False)))
+            existing[url] = (cursor.lastrowid, fingerprint, dict(new_event))
             logger.info(f"Added event: {url}")
+            changes.append(make_change("added", new_event, filename, new=get_card_times(new_event)))
+    return changes
+
+def find_removed_events(conn, filename, urls):
+    """
+    Marks upcoming events of a file, which are not part of `urls` anymore, as removed.
+    The events stay in the json files, they are only reported once in the change feed.
 
-    updated_events = list(events_dict.values())
+    Returns:
+        list: Changes of removed events
+    """
+    now = datetime.now(timezone.utc)
+    changes = []
+    rows = conn.execute("SELECT seq, url, date, data FROM events WHERE filename = ? AND removed = 0 AND date >= ?",
+                        (filename, (now - timedelta(days=1)).date().isoformat()))
+    for seq, url, date, data in rows.fetchall():
+        if url in urls or not date:
+            continue
+        date = datetime.fromisoformat(date)
+        if as_aware(date) < now:
+            continue
+        conn.execute("UPDATE events SET removed = 1 WHERE seq = ?", (seq,))
+        event = json.loads(data)
+        logger.info(f"Event removed: {url}")
+        changes.append(make_change("removed", event, filename, old=get_card_times(event)))
+    return changes
+
+def read_removed_state():
+    """
+    Returns the published removed flags, filename -> set of urls.
+    """
+    try:
+        with open(removed_state_path, "r", encoding="utf-8") as f:
+            return {filename: set(urls) for filename, urls in json.load(f).items()}
+    except (OSError, ValueError):
+        return {}
+
+def write_removed_state(conn):
+    """
+    Publishes the removed flags of the upcoming events in the store. The file is only written if a flag changed.
+    """
+    state = defaultdict(set)
+    rows = conn.execute("SELECT filename, url FROM events WHERE removed = 1 AND date >= ?",
+                        ((datetime.now(timezone.utc) - timedelta(days=1)).date().isoformat(),))
+    for filename, url in rows.fetchall():
+        state[filename].add(url)
+    if state == read_removed_state():
+        return
+    os.makedirs(changes_dir, exist_ok=True)
+    tmp_path = removed_state_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({filename: sorted(urls) for filename, urls in sorted(state.items())}, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, removed_state_path)
+
+def record_changes(changes):
+    with change_feed_lock:
+        change_feed.extend(changes)
+    for change in changes:
+        count(f"events.{change['type']}")
+
+def write_change_feed(run_id=None):
+    """
+    Appends the changes of this run to changes/changelog.jsonl and writes changes/latest.json.
+    `offset` in latest.json is the position of the run in the changelog, so consumers can
+    continue reading the changelog from the last offset they have seen.
+    """
+    with change_feed_lock:
+        changes, change_feed[:] = list(change_feed), []
+    if not changes:
+        logger.info("No changes for the change feed.")
+        return
+
+    run_time = datetime.now(timezone.utc)
+    run_id = run_id or run_time.strftime("%Y%m%dT%H%M%SZ")
+    os.makedirs(changes_dir, exist_ok=True)
+    changelog_path = os.path.join(changes_dir, "changelog.jsonl")
+    offset = os.path.getsize(changelog_path) if os.path.exists(changelog_path) else 0
+    with open(changelog_path, "a", encoding="utf-8") as f:
+        for change in changes:
+            f.write(json.dumps({"run": run_id, **change}, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+    latest = {
+        "run": run_id,
+        "time": run_time.isoformat(),
+        "offset": offset,
+        "counts": {change_type: sum(1 for change in changes if change["type"] == change_type) for change_type in ("added", "updated", "rescheduled", "removed")},
+        "changes": changes,
+    }
+    tmp_path = os.path.join(changes_dir, "latest.json.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(latest, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, os.path.join(changes_dir, "latest.json"))
+    logger.info(f"Change feed written: {latest['counts']}")
+
+@timed_stage("json.export")
+def export_json_file(conn, year, filename):
+    """
+    Regenerates json/{year}/{filename} from the store.
+    """
+    dir_path = f"./json/{year}"
+    file_path = get_json_file_path(year, filename)
+    os.makedirs(dir_path, exist_ok=True)
 
-    with open(file_path, "w", encoding="utf-8") as file:
-        json.dump(updated_events, file, indent=2, ensure_ascii=False)
+    events = [json.loads(row[0]) for row in conn.execute("SELECT data FROM events WHERE filename = ? AND year = ? ORDER BY seq", (filename, year))]
+    # written to a temporary file first, so an interrupted run never leaves a truncated file behind
+    tmp_path = f"{file_path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        json.dump(events, file, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, file_path)
+    with conn:
+        conn.execute("INSERT OR REPLACE INTO files (filename, year, stamp) VALUES (?, ?, ?)", (filename, year, get_file_stamp(file_path)))
+
+@timed_stage("json.merge")
+def merge_partitions(partitions, detect_removed=(), keep_urls=()):
+    """
+    Merges partitioned events into the store in one transaction and regenerates
+    every json file with changes exactly once. All changes are recorded for the change feed.
 
-def fetch_and_convert_one_ics_to_json():
-    response = requests.get(organisations["one"]["ical_file"])
-    response.raise_for_status()
+    Args:
+        partitions (dict): (year, filename) -> list of CombatEvent
+        detect_removed (iterable): Filenames, for which the events are complete,
+                                   so missing upcoming events are reported as removed
+        keep_urls (iterable): URLs which are never reported as removed, e.g. pages which failed to load
 
-    calendar = Calendar(response.text)
+    Returns:
+        dict: (year, filename) -> changes of added, updated or rescheduled events
+    """
+    changes = {}
+    removed = []
+    with event_store_lock:
+        conn = get_event_store()
+        for year, filename in partitions:
+            sync_event_store(conn, year, filename)
+        with conn:
+            for (year, filename), events in partitions.items():
+                changes[(year, filename)] = upsert_events(conn, [event.to_json() for event in events], year, filename)
+            for filename in detect_removed:
+                urls = {event.url for (_, partition_file), events in partitions.items() if partition_file == filename for event in events}
+                removed += find_removed_events(conn, filename, urls | set(keep_urls))
+        for (year, filename), changed in changes.items():
+            if changed or not os.path.exists(get_json_file_path(year, filename)):
+                export_json_file(conn, year, filename)
+        write_removed_state(conn)
+    record_changes([change for changed in changes.values() for change in changed] + removed)
+    return changes
 
+def write_events_to_json(events, filename):
+    """
+    Saves events in /json/{year} and updates existing.
+    All events are written to the file of the year of the first event, use `save_events` to split them by year.
+    
+    Args:
+        events (list): Liste of CombatEvent
+        filename (str): Filename without path
+    """
+    if not events:
+        logger.info("No events found for saving.")
+        return {}
+    return merge_partitions({(events[0].year, filename): events})
+
+@register_scraper
+class OneChampionshipScraper(Scraper):
+    name = "one"
+    organization = "One Championship"
+    filename = "one.json"
+    # One Championship has an official ics, which is linked directly instead of generating a calendar
+    ical_file = "https://calendar.onefc.com/ONE-Championship-events.ics"
+    generates_calendar = False
+    ical_name = "One Champtionship Events"
     broadcast = ["onefc", "youtube"]
     category = ["mma", "kickboxing", "grappling", "muay thai"]
 
-    events = []
+    def fetch(self):
+        response = http_get(self.ical_file, stream=True, defer_cache=True)
+        response.raise_for_status()
+        return None if response.not_modified else response
+
+    def parse(self, response):
+        for event in iter_ics_events(response.iter_lines()):
+            if not event.get("DTSTART"):
+                continue
+            yield self.make_event(
+                url=event.get("URL", "") or "n/a",
+                title=event.get("SUMMARY"),
+                date=event["DTSTART"],
+                description=event["DESCRIPTION"].split("\n\n")[1:-1] if event.get("DESCRIPTION") else [],
+                venue=event.get("LOCATION") or "n/a",
+                main_card=(event["DTSTART"], event["DTEND"])
+            )
 
-    for event in calendar.events:
-        event_json = {
-            "url": event.url if event.url else "n/a",
-            "organization": "One Championship",
-            "title": event.name,
-            "date": event.begin.isoformat(),
-            "description": event.description.split("\n\n")[1:-1] if event.description else [],
-            "broadcast": broadcast,
-            "venue": event.location if event.location else "n/a",
-            "category": category,
-            "cards": {
-                "main_card": {
-                    "start": event.begin.isoformat(),
-                    "end": event.end.isoformat() if event.end else None
-                },
-                "prelims": {
-                    "start": None,
-                    "end": None
-                }
-            },
-            "last_updated": datetime.now(timezone.utc).isoformat() + "Z"
-        }
+def iter_ics_events(lines):
+    """
+    Streaming VEVENT parser, yields one dict per event without building a calendar object graph.
 
-        events.append(event_json)
-    events = sorted(events, key=lambda event: event["date"], reverse=True)
-    save_events(events, 'one.json')
-    logger.info(f'Success!')
-    return events
+    Text values are unescaped, DTSTART/DTEND are returned as aware datetimes (floating times and
+    dates are interpreted as UTC) and DTEND is derived from DURATION or DTSTART if missing,
+    the same way the ics library does.
+
+    Args:
+        lines (iterable): Lines of the ics file
 
+    Yields:
+        dict: Properties of the event, e.g. URL, SUMMARY, DTSTART, DTEND, LOCATION, DESCRIPTION
+    """
+    event = None
+    nested = 0
+    for line in unfold_ics_lines(lines):
+        name, params, value = parse_ics_content_line(line)
+        if name == "BEGIN":
+            if event is not None:
+                nested += 1
+            elif value.upper() == "VEVENT":
+                event = {}
+        elif name == "END":
+            if nested:
+                nested -= 1
+            elif event is not None and value.upper() == "VEVENT":
+                yield convert_ics_event(event)
+                event = None
+        elif event is not None and not nested and name not in event:
+            event[name] = (params, value)
+
+def unfold_ics_lines(lines):
+    current = None
+    for line in lines:
+        if line[:1] in (" ", "\t") and current is not None:
+            current += line[1:]
+            continue
+        if current:
+            yield current
+        current = line
+    if current:
+        yield current
+
+def parse_ics_content_line(line):
+    """
+    Splits a content line into name, parameters and value, e.g.
+    `DTSTART;TZID=Asia/Bangkok:20250610T190000` -> ("DTSTART", {"TZID": "Asia/Bangkok"}, "20250610T190000")
+    """
+    in_quotes = False
+    for index, char in enumerate(line):
+        if char == '"':
+            in_quotes = not in_quotes
+        elif char == ":" and not in_quotes:
+            break
+    else:
+        return line.upper(), {}, ""
+    name, *raw_params = line[:index].split(";")
+    params = {}
+    for param in raw_params:
+        key, _, param_value = param.partition("=")
+        params[key.upper()] = param_value.strip('"')
+    return name.upper(), params, line[index + 1:]
+
+def unescape_ics_text(value):
+    return re.sub(r"\\([\\;,nN])", lambda m: "\n" if m.group(1) in "nN" else m.group(1), value)
+
+def parse_ics_datetime(params, value):
+    if params.get("VALUE") == "DATE" or len(value) == 8:
+        return datetime.strptime(value[:8], "%Y%m%d").replace(tzinfo=timezone.utc)
+    parsed = datetime.strptime(value.rstrip("Zz")[:15], "%Y%m%dT%H%M%S")
+    if value[-1:] in "Zz" or "TZID" not in params:
+        return parsed.replace(tzinfo=timezone.utc)
+    try:
+        return parsed.replace(tzinfo=ZoneInfo(params["TZID"]))
+    except Exception:
+        return parsed.replace(tzinfo=timezone.utc)
+
+def parse_ics_duration(value):
+    match = re.fullmatch(r"([+-])?P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?", value.strip())
+    if not match:
+        return None
+    sign, weeks, days, hours, minutes, seconds = match.groups()
+    duration = timedelta(weeks=int(weeks or 0), days=int(days or 0), hours=int(hours or 0), minutes=int(minutes or 0), seconds=int(seconds or 0))
+    return -duration if sign == "-" else duration
+
+def convert_ics_event(properties):
+    event = {}
+    for name in ("SUMMARY", "LOCATION", "DESCRIPTION"):
+        if name in properties:
+            event[name] = unescape_ics_text(properties[name][1])
+    if "URL" in properties:
+        event["URL"] = properties["URL"][1]
+
+    begin = parse_ics_datetime(*properties["DTSTART"]) if "DTSTART" in properties else None
+    duration = parse_ics_duration(properties["DURATION"][1]) if "DURATION" in properties else None
+    if begin and duration:
+        end = begin + duration
+    elif "DTEND" in properties:
+        end = parse_ics_datetime(*properties["DTEND"])
+    elif begin and (properties["DTSTART"][0].get("VALUE") == "DATE" or len(properties["DTSTART"][1]) == 8):
+        end = begin + timedelta(days=1)
+    else:
+        end = begin
+    event["DTSTART"] = begin
+    event["DTEND"] = end
+    return event
 
 def split_events_by_year(events):
     """
@@ -323,25 +1744,158 @@ def split_events_by_year(events):
     events_by_year = defaultdict(list)
 
     for event in events:
-        event_date = datetime.fromisoformat(event["date"])
-        event_year = event_date.year
-        events_by_year[event_year].append(event)
+        events_by_year[event.year].append(event)
     
     return events_by_year
 
-def save_events(events, filename):
-    events_by_year = split_events_by_year(events)
-    for year, events_list in events_by_year.items():
-        write_events_to_json(events_list, filename)
+def save_events(events, filename, detect_removed=False, keep_urls=()):
+    return save_events_bulk({filename: events}, detect_removed, keep_urls)
+
+def save_events_bulk(events_by_file, detect_removed=False, keep_urls=()):
+    """
+    Saves the events of several organisations at once. Events are partitioned by year and file
+    in a single pass, every affected file is loaded and written at most once.
+
+    Args:
+        events_by_file (dict): Filename without path -> list of CombatEvent
+        detect_removed (bool): Report upcoming events missing in `events_by_file` as removed
+        keep_urls (iterable): URLs which are never reported as removed
+
+    Returns:
+        dict: (year, filename) -> changes of added, updated or rescheduled events
+    """
+    partitions = {}
+    for filename, events in events_by_file.items():
+        for year, events_list in split_events_by_year(events).items():
+            partitions[(year, filename)] = events_list
+    if not partitions:
+        logger.info("No events found for saving.")
+        return {}
+    return merge_partitions(partitions, list(events_by_file) if detect_removed else (), keep_urls)
+
+
+def get_api_events(conn):
+    """
+    Returns the events of all organisations from the store, sorted by date.
+    Only the files of registered scrapers are exported, legacy files like one_championship.json are skipped.
+    """
+    filenames = sorted({org_data["scraper"].filename for org_data in organisations.values()})
+    for filename in filenames:
+        for file_path in glob.glob(os.path.join("json", "*", filename)):
+            year = os.path.basename(os.path.dirname(file_path))
+            if year.isdigit():
+                sync_event_store(conn, int(year), filename)
+    rows = conn.execute(f"SELECT data FROM events WHERE filename IN ({', '.join('?' for _ in filenames)})", filenames).fetchall()
+    events = [json.loads(row[0]) for row in rows]
+    events.sort(key=lambda event: CombatEvent.from_json(event).sort_key())
+    return events
+
+def write_api_file(file_path, data):
+    """
+    Writes `data` as minified json with compressed siblings. Files with unchanged content are not touched.
+
+    Returns:
+        dict: Manifest entry with hash and sizes of the file
+    """
+    content = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    compressed = {".gz": lambda: gzip.compress(content, compresslevel=9, mtime=0)}
+    if brotli:
+        compressed[".br"] = lambda: brotli.compress(content, quality=11)
 
+    try:
+        with open(file_path, "rb") as f:
+            unchanged = f.read() == content
+    except OSError:
+        unchanged = False
+
+    entry = {"hash": hashlib.sha256(content).hexdigest()[:16], "size": len(content)}
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    if not unchanged:
+        with open(file_path, "wb") as f:
+            f.write(content)
+    for suffix, compress in compressed.items():
+        if unchanged and os.path.exists(file_path + suffix):
+            entry[suffix[1:]] = os.path.getsize(file_path + suffix)
+            continue
+        compressed_content = compress()
+        with open(file_path + suffix, "wb") as f:
+            f.write(compressed_content)
+        entry[suffix[1:]] = len(compressed_content)
+    return entry
+
+def get_api_index(events, key):
+    """
+    Counts the upcoming events and the events per season of every value of `key` (organization or category).
+    """
+    now = datetime.now(timezone.utc)
+    index = {}
+    for event in events:
+        values = event[key] if isinstance(event[key], list) else [event[key]]
+        upcoming = is_upcoming_event(event, now)
+        season = event["date"][:4]
+        for value in values:
+            entry = index.setdefault(value, {"upcoming": 0, "seasons": {}})
+            entry["upcoming"] += upcoming
+            entry["seasons"][season] = entry["seasons"].get(season, 0) + 1
+    return dict(sorted(index.items()))
+
+def is_upcoming_event(event, now):
+    # an event is upcoming until its main card ended
+    end = parse_iso((event.get("cards", {}).get("main_card") or {}).get("end") or event["date"])
+    return as_aware(end) >= now
+
+@timed_stage("api.export")
+def write_api_bundles():
+    """
+    Exports the events of the store as static api in `api_dir`. The manifest is only rewritten
+    if a bundle changed, so runs without changes don't produce a diff.
+    """
+    with event_store_lock:
+        events = get_api_events(get_event_store())
+    now = datetime.now(timezone.utc)
 
+    seasons = defaultdict(list)
+    for event in events:
+        seasons[event["date"][:4]].append(event)
+    bundles = {
+        "upcoming.json": [event for event in events if is_upcoming_event(event, now)],
+        **{f"seasons/{season}.json": season_events for season, season_events in sorted(seasons.items())},
+        "index/organizations.json": get_api_index(events, "organization"),
+        "index/categories.json": get_api_index(events, "category"),
+    }
+    files = {name: write_api_file(os.path.join(api_dir, name), data) for name, data in bundles.items()}
 
-def scrape_ufc():
+    manifest_path = os.path.join(api_dir, "manifest.json")
+    try:
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = {}
+    if manifest.get("version") == API_VERSION and manifest.get("files") == files:
+        logger.info("Static api unchanged.")
+        return manifest
+
+    manifest = {
+        "version": API_VERSION,
+        "generated": now.isoformat(),
+        "seasons": sorted(seasons),
+        "files": files,
+    }
+    write_api_file(manifest_path, manifest)
+    logger.info(f"Static api written: {len(events)} events, {len(bundles['upcoming.json'])} upcoming.")
+    return manifest
+
+@register_scraper
+class UfcScraper(Scraper):
+    name = "ufc"
+    organization = "ufc"
+    filename = "ufc.json"
+    ical_file = "ufc_events.ics"
+    ical_name = "UFC Events"
+    broadcast = ["triller_tv"]
+    category = "mma"
     config = {
-        "headers": {
-            "Accept-Language": "en",
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/114.0.0.0 Safari/537.36",
-        },
+        "headers": DEFAULT_HEADERS,
         "cookies": { 
             "STYXKEY_region": "GERMANY.DE.en.Default" 
         },
@@ -349,16 +1903,20 @@ def scrape_ufc():
         "base_domain": "https://www.ufc.com",
         "scrape_domain": "https://www.ufc.com/events"
     }
-    
-    
-    response = requests.get(config["scrape_domain"], headers=config["headers"], cookies=config["cookies"])
-
-    if response.status_code == 200:
-        soup = BeautifulSoup(response.text, 'html.parser')
+    listing_strainer = SoupStrainer('div', class_='c-card-event--result__info')
+    detail_strainer = SoupStrainer('h1')
+
+    def fetch(self):
+        config = self.config
+        response = http_get(config["scrape_domain"], headers=config["headers"], cookies=config["cookies"], defer_cache=True)
+        response.raise_for_status()
+        return None if response.not_modified else response
+
+    def parse(self, response):
+        config = self.config
+        soup = parse_html(response.text, self.listing_strainer)
         event_cards = soup.find_all('div', class_='c-card-event--result__info')
 
-        events = []
-
         for card in event_cards:
             a_fight_detail_url = card.find('a', href=True)
             href = a_fight_detail_url['href']
@@ -375,8 +1933,13 @@ def scrape_ufc():
                 if ufc_number:
                     event_name = f"UFC {ufc_number.group(1)}: {fight_name}"
                 else: # Get Headline from detail page
-                    detail_page = BeautifulSoup(requests.get(event_url, headers=config["headers"], cookies=config["cookies"]).text, 'html.parser')
-                    event_headline = detail_page.find('h1').text.strip()
+                    date = card.find('div', class_='c-card-event--result__date')['data-main-card-timestamp']
+                    try:
+                        event_headline = self.fetch_headline(event_url, parse_datetime(date))
+                    except requests.RequestException as e:
+                        logger.error(f"Error fetching the headline of {event_url}: {e}")
+                        self.failed_urls.add(event_url)
+                        continue
                     event_name = f"{event_headline}: {fight_name}"
             
             # Location
@@ -401,177 +1964,849 @@ def scrape_ufc():
             prelims_end = None
             for section, timestamp_id in event_dates.items():
                 timestamp = div_fight_dates[timestamp_id]
-                parsed_begin_date = dateparser.parse(timestamp).astimezone(timezone.utc)
-                event_begin_utc = parsed_begin_date.astimezone(timezone.utc).isoformat() if parsed_begin_date else None
+                parsed_begin_date = parse_datetime(timestamp).astimezone(timezone.utc)
+                event_begin_utc = parsed_begin_date.astimezone(timezone.utc) if parsed_begin_date else None
                 
                 if section == "Main-Card":
-                    main_card_end = (parsed_begin_date + timedelta(hours=config["duration"])).astimezone(timezone.utc).isoformat()
-                    main_card_begin = parsed_begin_date.isoformat()
+                    main_card_end = (parsed_begin_date + timedelta(hours=config["duration"])).astimezone(timezone.utc)
+                    main_card_begin = parsed_begin_date
                 elif section == "Prelims" and main_card_begin:
                     prelims_end = main_card_begin
-                    prelims_begin = parsed_begin_date.isoformat()
+                    prelims_begin = parsed_begin_date
+
+            yield self.make_event(
+                url=event_url,
+                title=event_name,
+                date=event_begin_utc,
+                description=None,
+                venue=location,
+                main_card=(main_card_begin, main_card_end),
+                prelims=(prelims_begin if prelims_begin else None, prelims_end if prelims_end else None)
+            )
 
-            event =  {
-                "url": event_url,
-                "organization": "ufc",
-                "title": event_name,
-                "date": event_begin_utc,
-                "description": None,
-                "broadcast": ["triller_tv"],
-                "venue": location,
-                "category": "mma",
-                "cards": {
-                    "main_card": {
-                            "start": main_card_begin,
-                            "end": main_card_end
-                    },
-                    "prelims": {
-                        "start": prelims_begin if prelims_begin else None,
-                        "end": prelims_end if prelims_end else None
-                    }
-                },
-                "last_updated": datetime.now(timezone.utc).isoformat() + "Z",
-            }
-            events.append(event)
-        events = sorted(events, key=lambda event: event["date"], reverse=True)
-        save_events(events, 'ufc.json')
-        logger.info(f'Success!')
-        return events
+    def fetch_headline(self, event_url, date):
+        """
+        Returns the headline of an event detail page, using the page cache.
+        Raises requests.HTTPError for error responses, which are never cached.
+        """
+        config = self.config
+        cached = page_cache.get_frozen(event_url)
+        if cached is None:
+            response = http_get(event_url, headers=config["headers"], cookies=config["cookies"])
+            response.raise_for_status()
+            detail_page = parse_html(response.text, self.detail_strainer)
+            content_hash = get_page_hash(detail_page)
+            cached = page_cache.get(event_url, content_hash)
+            if cached is None:
+                cached = {"headline": detail_page.find('h1').text.strip()}
+                page_cache.put(event_url, content_hash, cached, to_utc_iso(date))
+        return cached["headline"]
+
+CARD_NAMES = {'prelims': "Preliminaries", 'main_card': "Main Card"}
+
+def get_calendar_index_path(calendar_file):
+    return os.path.join(calendar_index_dir, calendar_file + ".index.json")
+
+def get_calendar_event_hash(name, begin, end, description, location):
+    content = json.dumps([name, to_utc_iso(begin), to_utc_iso(end), description or None, location or None], ensure_ascii=False)
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+def to_utc_iso(value):
+    if value is None:
+        return None
+    return as_aware(value).astimezone(timezone.utc).isoformat()
+
+def parse_calendar_block(block):
+    """
+    Parses a VEVENT block of our own calendars into a dict with the properties we write.
+    """
+    properties = {}
+    for line in unfold_ics_lines(block.decode("utf-8").split("\r\n")):
+        name, params, value = parse_ics_content_line(line)
+        properties.setdefault(name, (params, value))
+    get_text = lambda name: unescape_ics_text(properties[name][1]) if name in properties else None
+    return {
+        "card": properties.get("X-FIGHTCARD", ({}, None))[1],
+        "url": get_text("URL"),
+        "uid": properties.get("UID", ({}, None))[1],
+        "name": get_text("SUMMARY"),
+        "begin": parse_ics_datetime(*properties["DTSTART"]) if "DTSTART" in properties else None,
+        "end": parse_ics_datetime(*properties["DTEND"]) if "DTEND" in properties else None,
+        "description": get_text("DESCRIPTION"),
+        "location": get_text("LOCATION"),
+    }
 
-def get_custom_ical_property(event, property_name):
-    for line in event.extra:
-        if line.name == property_name:
-            return line.value
-    return None
+def build_calendar_index(content):
+    """
+    Scans a calendar for VEVENT blocks.
 
-def update_calendar(events, calendar_file, calendar_name):
-    if calendar_name == organisations["one"]["ical_name"]:
-        # One Championship has direct link to official ics
-        return
-    logger.info(f'Updating calendar for {calendar_name}...')
+    Returns:
+        dict: URL#card -> [offset, length, content hash, begin]
+    """
+    index = {}
+    offset = content.find(b"BEGIN:VEVENT")
+    while offset != -1:
+        end = content.index(b"END:VEVENT", offset) + len(b"END:VEVENT")
+        block = parse_calendar_block(content[offset:end])
+        if block["url"]:
+            index[block["url"]] = [
+                offset,
+                end - offset,
+                get_calendar_event_hash(block["name"], block["begin"], block["end"], block["description"], block["location"]),
+                to_utc_iso(block["begin"]),
+            ]
+        offset = content.find(b"BEGIN:VEVENT", end)
+    return index
+
+def load_calendar(calendar_path, calendar_file):
+    """
+    Returns the index of the calendar from the sidecar file, rebuilding it if the calendar changed.
+    The calendar content is only read if the index has to be rebuilt, otherwise it is None.
+    """
+    stamp = get_file_stamp(calendar_path)
+    try:
+        with open(get_calendar_index_path(calendar_file), "r", encoding="utf-8") as f:
+            sidecar = json.load(f)
+        if stamp and sidecar["stamp"] == stamp:
+            return sidecar["events"], None
+    except (OSError, ValueError, KeyError):
+        pass
+    if not stamp:
+        return {}, None
+    with open(calendar_path, "rb") as f:
+        content = f.read()
+    return build_calendar_index(content), content
+
+def serialize_calendar_event(url, card, name, begin, end, description, location, uid=None):
+    event = Event()
+    event.extra.append(ContentLine(name="X-FIGHTCARD", value=card))
+    event.name = name
+    event.begin = begin
+    event.end = end
+    event.description = description
+    event.location = location
+    event.last_modified = datetime.now(timezone.utc)
+    event.url = url
+    if uid:
+        event.uid = uid
+    return event.serialize().encode("utf-8")
+
+def write_calendar(calendar_path, calendar_file, calendar_name, content, index, replacements, additions):
+    """
+    Patches the changed VEVENT blocks into the calendar, appends new ones and writes it atomically.
 
-    os.makedirs('ics', exist_ok=True)
-    calendar_path = os.path.join('ics', calendar_file)
-    if os.path.exists(calendar_path):
-        with open(calendar_path, 'r') as f:
-            calendar = Calendar(f.read())
-    else:
+    Args:
+        content (bytes): Current calendar, None if it does not exist yet
+        index (dict): URL#card -> [offset, length, hash, begin] of `content`
+        replacements (dict): URL#card -> (new block, hash, begin) for existing events
+        additions (list): (URL#card, new block, hash, begin) for new events
+    """
+    if content is None:
         calendar = Calendar()
         calendar.name = calendar_name
         calendar.extra.append(ContentLine(name="X-WR-CALNAME", value=calendar_name)) # for iCal
+        content = calendar.serialize().encode("utf-8")
+
+    patches = sorted((index[key][0], index[key][1], key, *replacement) for key, replacement in replacements.items())
+    footer = content.rindex(b"END:VCALENDAR")
+    pieces = []
+    position = 0
+    shift = 0
+    new_index = {}
+    shifts = []
+    for offset, length, key, block, event_hash, begin in patches:
+        pieces.append(content[position:offset])
+        pieces.append(block)
+        position = offset + length
+        new_index[key] = [offset + shift, len(block), event_hash, begin]
+        shift += len(block) - length
+        shifts.append((offset, shift))
+    pieces.append(content[position:footer])
+    size = footer + shift
+    for key, block, event_hash, begin in additions:
+        pieces.append(block + b"\r\n")
+        new_index[key] = [size, len(block), event_hash, begin]
+        size += len(block) + 2
+    pieces.append(content[footer:])
+
+    offsets = [offset for offset, _ in shifts]
+    for key, entry in index.items():
+        if key not in new_index:
+            position = bisect.bisect_left(offsets, entry[0])
+            new_index[key] = [entry[0] + (shifts[position - 1][1] if position else 0), *entry[1:]]
+
+    tmp_path = calendar_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.writelines(pieces)
+    os.replace(tmp_path, calendar_path)
+
+    os.makedirs(calendar_index_dir, exist_ok=True)
+    with open(get_calendar_index_path(calendar_file), "w", encoding="utf-8") as f:
+        json.dump({"stamp": get_file_stamp(calendar_path), "events": new_index}, f)
+
+@timed_stage("calendar.update")
+def update_calendar(events, calendar_file, calendar_name):
+    """
+    Adds new events to the calendar and updates upcoming ones. Only added or changed VEVENT blocks
+    are rewritten, the calendar is not written at all if nothing changed.
+    """
+    logger.info(f'Updating calendar for {calendar_name}...')
 
-    existing_events = {event.url: event for event in calendar.events}
+    os.makedirs('ics', exist_ok=True)
+    calendar_path = os.path.join('ics', calendar_file)
+    index, content = load_calendar(calendar_path, calendar_file)
 
+    replacements = {}
+    additions = []
+    added = set()
+    now = datetime.now(timezone.utc)
     for event_data in events:
-        event_url = event_data.get("url", None)
-        event_name = event_data['title']
-        card_dict = {'prelims': "Preliminaries",'main_card': "Main Card"}
-        for card, card_name in card_dict.items():
+        event_url = event_data.url
+        event_name = event_data.title
+        event_description = event_data.description
+        event_location = event_data.venue
+        for card, card_name in CARD_NAMES.items():
+            # url in json is valid for prelims and main, so we need to add url id present in events
             event_url_card_specific = event_url + "#" + card
-            event_description = event_data.get("description", None)
-            event_location = event_data.get("venue", None)
+            begin = getattr(event_data, card).start
+            end = getattr(event_data, card).end
+            if not begin:
+                continue
 
-            # url in json is valid for prelims and main, so we need to add url id present in events
-            if event_url_card_specific not in existing_events:
+            if event_url_card_specific not in index:
                 # Add new events
-                
-                if not event_data['cards'][card]['start']:
-                        continue
+                if event_url_card_specific in added:
+                    continue
+                name = event_name + " - " + card_name
+                try:
+                    block = serialize_calendar_event(event_url_card_specific, card, name, begin, end, event_description, event_location)
+                except ValueError as e:
+                    logger.error(f"Invalid calendar event {event_url_card_specific}: {e}")
+                    continue
+                additions.append((event_url_card_specific, block, get_calendar_event_hash(name, begin, end, event_description, event_location), to_utc_iso(begin)))
+                added.add(event_url_card_specific)
+                continue
+
+            # Update existing event if not in past
+            offset, length, event_hash, existing_begin = index[event_url_card_specific]
+            if datetime.fromisoformat(existing_begin) < now:
+                continue
+            if event_hash == get_calendar_event_hash(event_name + " - " + card_name, begin, end, event_description, event_location):
+                continue
+
+            if content is None:
+                with open(calendar_path, "rb") as f:
+                    content = f.read()
+            existing_event = parse_calendar_block(content[offset:offset + length])
+            # name is not equal, since events have additional card info
+            name = existing_event["name"] or ""
+            if event_name not in name:
+                name = event_name + " - " + CARD_NAMES[existing_event["card"]]
+            new_values = (name, to_utc_iso(begin), to_utc_iso(end), event_description or None, event_location or None)
+            old_values = (existing_event["name"], to_utc_iso(existing_event["begin"]), to_utc_iso(existing_event["end"]), existing_event["description"], existing_event["location"])
+            event_hash = get_calendar_event_hash(name, begin, end, event_description, event_location)
+            if new_values == old_values:
+                continue
+            try:
+                block = serialize_calendar_event(event_url_card_specific, existing_event["card"], name, begin, end, event_description, event_location, uid=existing_event["uid"])
+            except ValueError as e:
+                logger.error(f"Invalid calendar event {event_url_card_specific}: {e}")
+                continue
+            replacements[event_url_card_specific] = (block, event_hash, to_utc_iso(begin))
+
+    if not replacements and not additions and os.path.exists(calendar_path):
+        logger.info('No calendar changes.')
+        return
 
-                event = Event()
-                event.extra.append(ContentLine(name="X-FIGHTCARD", value=card))
-                event.name = event_name + " - " + card_name
-                event.begin = datetime.fromisoformat(event_data['cards'][card]['start'])
-                event.end = datetime.fromisoformat(event_data['cards'][card]['end'])
-                event.description = event_description
-                event.location = event_location
-                event.last_modified = datetime.now()
-                event.url = event_url_card_specific # for unique urls in events
-                calendar.events.add(event)
+    if content is None and os.path.exists(calendar_path):
+        with open(calendar_path, "rb") as f:
+            content = f.read()
+    with timed("calendar.write"):
+        write_calendar(calendar_path, calendar_file, calendar_name, content, index, replacements, additions)
+    count("calendar.added", len(additions))
+    count("calendar.updated", len(replacements))
+    logger.info(f'Success! {len(additions)} events added, {len(replacements)} events updated.')
 
-            else:
-                # Update existing event if not in past
-                existing_event = existing_events[event_url_card_specific]
-                if not existing_event.begin < datetime.now(timezone.utc):
-                    # name is not equal, since events have additional card info
-                    if event_name not in existing_event.name:
-                        existing_event.name = event_name + " - " + card_dict[get_custom_ical_property(existing_event, 'X-FIGHTCARD')]
-                        existing_event.last_modified = datetime.now(timezone.utc)
-                    for property, value in {
-                        "begin": datetime.fromisoformat(event_data['cards'][get_custom_ical_property(existing_event, 'X-FIGHTCARD')]['start']),
-                        "end": datetime.fromisoformat(event_data['cards'][get_custom_ical_property(existing_event, 'X-FIGHTCARD')]['end']),
-                        "description": event_description,
-                        "location": event_location
-                    }.items():
-                        if getattr(existing_event, property) != value:
-                            setattr(existing_event, property, value)
-                            existing_event.last_modified = datetime.now(timezone.utc)
-
-    with open(calendar_path, 'w') as f:
-        f.writelines(calendar)
-    logger.info(f'Success!')
+class FeedEngine:
+    """
+    Renders combined or filtered calendars of all organisations.
+
+    The VEVENT blocks of all events are serialized once and indexed by organisation (the key in `organisations`),
+    category and card type, whenever the json files changed. Rendered feeds are cached together with their ETag
+    until the next change, so polling calendar clients don't cause any rendering.
+    """
+    def __init__(self, reload_interval=feed_reload_interval, cache_size=feed_cache_size):
+        self.reload_interval = reload_interval
+        self.cache_size = cache_size
+        self.blocks = []
+        self.index = {}
+        self.last_modified = None
+        self._stamp = None
+        self._checked = float("-inf")
+        self._cache = {}
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+
+    def get_stamp(self):
+        filenames = {org_data["scraper"].filename for org_data in organisations.values()}
+        return tuple(sorted((file_path, get_file_stamp(file_path)) for filename in filenames
+                            for file_path in glob.glob(os.path.join("json", "*", filename))))
+
+    def refresh(self):
+        """
+        Rebuilds the index if the json files changed, checked at most every `reload_interval` seconds.
+        """
+        with self._refresh_lock:
+            if time.monotonic() - self._checked < self.reload_interval:
+                return
+            self._checked = time.monotonic()
+            stamp = self.get_stamp()
+            if stamp != self._stamp:
+                self.build()
+                self._stamp = stamp
+
+    @timed_stage("feeds.build")
+    def build(self):
+        with event_store_lock:
+            events = get_api_events(get_event_store())
+        blocks = []
+        index = {key: defaultdict(set) for key in FEED_FILTERS.values()}
+        org_keys = {get_feed_key(org_data["scraper"].organization): org_name for org_name, org_data in organisations.items()}
+        for event_data in events:
+            event = CombatEvent.from_json(event_data)
+            categories = event.category if isinstance(event.category, list) else [event.category]
+            # One Championship events have a list of bouts as description
+            description = "\n".join(event.description) if isinstance(event.description, list) else event.description
+            for card, card_name in CARD_NAMES.items():
+                begin, end = getattr(event, card).start, getattr(event, card).end
+                if not begin:
+                    continue
+                key = event.url + "#" + card
+                try:
+                    # the uid is derived from the url, so calendar clients recognize events after a rebuild
+                    block = serialize_calendar_event(key, card, event.title + " - " + card_name, begin, end, description,
+                                                     event.venue, uid=str(uuid.uuid5(uuid.NAMESPACE_URL, key)))
+                except ValueError as e:
+                    logger.error(f"Invalid calendar event {key}: {e}")
+                    continue
+                position = len(blocks)
+                blocks.append(block)
+                organization = get_feed_key(event.organization)
+                index["organization"][org_keys.get(organization, organization)].add(position)
+                for category in categories:
+                    index["category"][get_feed_key(category)].add(position)
+                index["card"][get_feed_key(card)].add(position)
+        with self._lock:
+            self.blocks = blocks
+            self.index = index
+            self.last_modified = email.utils.formatdate(usegmt=True)
+            self._cache.clear()
+        logger.info(f"Feed index built: {len(blocks)} calendar events.")
+
+    def render(self, filters):
+        """
+        Returns the calendar of the events matching all `filters` (filter -> tuple of accepted values).
+        Raises ValueError for unknown values, so misspelled feeds are not served as empty calendars.
+
+        Returns:
+            tuple: Calendar as bytes, ETag and Last-Modified header
+        """
+        self.refresh()
+        key = tuple(sorted(filters.items()))
+        with self._lock:
+            for name, values in key:
+                known = self.index[FEED_FILTERS[name]]
+                unknown = [value for value in values if value not in known]
+                if unknown:
+                    raise ValueError(f"Unknown {name} {', '.join(unknown)}, expected one of {', '.join(sorted(known))}.")
+            if key in self._cache:
+                count("feeds.cache_hits")
+                return self._cache[key]
+            positions = range(len(self.blocks))
+            for name, values in key:
+                matching = set().union(*(self.index[FEED_FILTERS[name]].get(value, ()) for value in values))
+                positions = [position for position in positions if position in matching]
+            blocks = [self.blocks[position] for position in positions]
+
+            calendar_name = "Combat Sports Events"
+            if filters.get("org"):
+                calendar_name = ", ".join(value.upper() if len(value) <= 3 else value.title() for value in filters["org"]) + " Events"
+            calendar = Calendar()
+            calendar.name = calendar_name
+            calendar.extra.append(ContentLine(name="X-WR-CALNAME", value=calendar_name)) # for iCal
+            content = calendar.serialize().encode("utf-8")
+            footer = content.rindex(b"END:VCALENDAR")
+            body = content[:footer] + b"".join(block + b"\r\n" for block in blocks) + content[footer:]
+            etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+            rendered = (body, etag, self.last_modified)
+            if len(self._cache) >= self.cache_size:
+                self._cache.pop(next(iter(self._cache)))
+            self._cache[key] = rendered
+        count("feeds.rendered")
+        return rendered
+
+def get_feed_key(value):
+    # "Muay Thai", "muay-thai" and "muaythai" are the same filter value
+    return re.sub(r"[\s_-]+", "", (value or "").lower())
+
+def parse_feed_query(query):
+    """
+    Parses the filters of a feed url, e.g. "org=ufc,glory&card=main_card". Raises ValueError for unknown filters.
+    """
+    filters = {}
+    for name, values in parse_qs(query).items():
+        if name not in FEED_FILTERS:
+            raise ValueError(f"Unknown filter {name}, expected one of {', '.join(FEED_FILTERS)}.")
+        filters[name] = tuple(sorted({get_feed_key(value) for joined in values for value in joined.split(",") if value.strip()}))
+    return filters
+
+class FeedRequestHandler(BaseHTTPRequestHandler):
+    """
+    Serves /feed.ics of `feed_engine` and answers conditional requests of calendar clients with 304.
+    """
+    feed_engine = None
+
+    def do_HEAD(self):
+        self.handle_feed(send_body=False)
+
+    def do_GET(self):
+        self.handle_feed(send_body=True)
+
+    def handle_feed(self, send_body):
+        url = urlsplit(self.path)
+        if url.path != "/feed.ics":
+            self.send_error(404)
+            return
+        try:
+            body, etag, last_modified = self.feed_engine.render(parse_feed_query(url.query))
+        except ValueError as e:
+            self.send_error(400, str(e))
+            return
+
+        if self.is_not_modified(etag, last_modified):
+            count("feeds.not_modified")
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", last_modified)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/calendar; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", last_modified)
+        self.send_header("Cache-Control", f"public, max-age={feed_reload_interval}")
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def is_not_modified(self, etag, last_modified):
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match:
+            return etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*"
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_modified_since:
+            try:
+                return email.utils.parsedate_to_datetime(if_modified_since) >= email.utils.parsedate_to_datetime(last_modified)
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def log_message(self, format, *args):
+        logger.debug(f"Feed server: {format % args}")
+
+def start_feed_server(host=feed_host, port=feed_port):
+    """
+    Starts the feed server in a background thread and returns it, stop it with `shutdown()`.
+    """
+    handler = type("Handler", (FeedRequestHandler,), {"feed_engine": FeedEngine()})
+    server = ThreadingHTTPServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, name="feed-server", daemon=True).start()
+    logger.info(f"Serving calendar feeds on http://{host}:{server.server_address[1]}/feed.ics")
+    return server
+
+def run_git(*args, check=True, input=None):
+    """
+    Runs a git command, timed as stage git.{command}, and returns the completed process with captured output.
+    """
+    with timed(f"git.{args[0]}"):
+        result = subprocess.run(["git", *args], input=input, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    if check and result.returncode != 0:
+        raise subprocess.CalledProcessError(result.returncode, ["git", *args], result.stdout, result.stderr)
+    return result
+
+def get_git_branch():
+    return git_branch or run_git("rev-parse", "--abbrev-ref", "HEAD").stdout.strip()
+
+def git_fetch(branch):
+    """
+    Fetches the branch from origin, only the last `git_depth` commits if set. Returns the fetched commit.
+    """
+    run_git("fetch", "--no-tags", *([f"--depth={git_depth}"] if git_depth else []), "origin", branch)
+    return run_git("rev-parse", "FETCH_HEAD").stdout.strip()
 
 def git_pull():
+    """
+    Syncs the working copy with origin. With `git_depth` only the newest commits are fetched and
+    unpublished local commits are rebased onto them, so the cost does not grow with the history.
+    With `git_sparse` the checkout is limited to `PUBLISHED_PATHS` and the files in the root.
+    """
     try:
-        subprocess.run(["git", "pull", "--no-edit"], check=True)
+        if git_sparse and run_git("config", "--get", "core.sparseCheckout", check=False).stdout.strip() != "true":
+            run_git("sparse-checkout", "set", *PUBLISHED_PATHS)
+        if not git_depth:
+            run_git("pull", "--no-edit")
+            return
+        branch = get_git_branch()
+        # commits after the last synced or pushed commit are not published yet
+        base = run_git("rev-parse", "--verify", "--quiet", f"refs/remotes/origin/{branch}", check=False).stdout.strip()
+        fetched = git_fetch(branch)
+        if base:
+            run_git("rebase", "--autostash", "--onto", fetched, base)
+        else:
+            run_git("reset", "--keep", fetched)
+        run_git("update-ref", f"refs/remotes/origin/{branch}", fetched)
     except subprocess.CalledProcessError as e:
-        logger.error("Error during git pull: Check for merge conflicts.")
+        logger.error(f"Error during git sync: Check for merge conflicts. {e.stderr}")
         raise
 
-def git_add_files(pattern):
-    files = glob.glob(pattern, recursive=True)
+def git_stage_changes(paths=PUBLISHED_PATHS, exclude=()):
+    """
+    Stages the files below `paths`, which were added, changed or deleted by the run.
+    Files matching one of the pathspecs in `exclude` are left unstaged.
+
+    Returns:
+        list: Staged paths
+    """
+    status = run_git("status", "--porcelain", "-z", "--untracked-files=all", "--", *paths, *(f":(exclude){path}" for path in exclude)).stdout
+    files = []
+    entries = iter(status.split("\0"))
+    for entry in entries:
+        if not entry:
+            continue
+        files.append(entry[3:])
+        if entry[0] in "RC":
+            # renames are followed by their source path, which is already staged and must not be passed to git add
+            next(entries)
     if files:
-        subprocess.run(["git", "add"] + files, check=True)
+        run_git("add", "--all", "--pathspec-from-file=-", "--pathspec-file-nul", input="\0".join(files))
+    logger.info(f"Staged {len(files)} changed files.")
+    return files
 
+def get_squash_commit(branch):
+    """
+    Returns the last commit if the run should amend it: it is an automatic commit of this branch,
+    it is published and it is younger than `git_squash_window` seconds.
+    """
+    if not git_squash_window:
+        return None
+    head, timestamp, message = run_git("log", "-1", "--format=%H%n%ct%n%s").stdout.split("\n", 2)
+    published = run_git("rev-parse", "--verify", "--quiet", f"refs/remotes/origin/{branch}", check=False).stdout.strip()
+    if message.strip() != GIT_COMMIT_MESSAGE or head != published or time.time() - int(timestamp) > git_squash_window:
+        return None
+    return head
+
+def git_push(branch, lease=None):
+    """
+    Pushes HEAD to `branch`, rebasing the unpublished commits onto the remote branch and retrying if the push was rejected.
+    `lease` is the remote commit expected by a force push of an amended commit.
+    """
+    for attempt in range(1, git_push_retries + 1):
+        force = [f"--force-with-lease={branch}:{lease}"] if lease else []
+        result = run_git("push", *force, repo_url, f"HEAD:refs/heads/{branch}", check=False)
+        if result.returncode == 0:
+            run_git("update-ref", f"refs/remotes/origin/{branch}", "HEAD")
+            return
+        if "rejected" not in result.stderr and "stale info" not in result.stderr:
+            raise subprocess.CalledProcessError(result.returncode, result.args, result.stdout, result.stderr)
+        logger.info(f"Push rejected (attempt {attempt}/{git_push_retries}), rebasing onto {branch}...")
+        # every commit after the last published one is replayed, including those of earlier runs whose push failed
+        base = run_git("rev-parse", "--verify", "--quiet", f"refs/remotes/origin/{branch}", check=False).stdout.strip()
+        fetched = git_fetch(branch)
+        if lease:
+            # the remote moved on, the changes of the amended commit are published as a new commit on top of it instead
+            run_git("reset", "--soft", lease)
+            run_git("commit", "-m", GIT_COMMIT_MESSAGE)
+            base, lease = lease, None
+        base = base or run_git("merge-base", "HEAD", fetched).stdout.strip()
+        # files of abandoned pipelines are left unstaged on purpose, see `publish_run`
+        rebase = run_git("rebase", "--autostash", "--onto", fetched, base, check=False)
+        if rebase.returncode != 0:
+            run_git("rebase", "--abort", check=False)
+            raise subprocess.CalledProcessError(rebase.returncode, rebase.args, rebase.stdout, rebase.stderr)
+    raise RuntimeError(f"Push to {branch} rejected {git_push_retries} times.")
+
+@timed_stage("git.commit_and_push")
 def git_commit_and_push():
+    """
+    Commits the staged changes of the run in one commit and pushes it. Within `git_squash_window`
+    the previous automatic commit is amended and force pushed instead.
+    """
     try:
-        # Check if there are changes
-        result = subprocess.run(["git", "status", "--porcelain"], check=True, stdout=subprocess.PIPE, text=True)
-        if not result.stdout.strip():
+        if run_git("diff", "--cached", "--quiet", check=False).returncode == 0:
             logger.info("No changes to commit.")
             return
-        
-        # Commit and push changes
-        subprocess.run(["git", "commit", "-m", "AUTO: update ics and json files"], check=True)
-        subprocess.run(["git", "push", repo_url], check=True)
-        logger.info("Changes successfully committed and pushed to remote.")
+
+        branch = get_git_branch()
+        squash_commit = get_squash_commit(branch)
+        if squash_commit:
+            run_git("commit", "--amend", "--no-edit", "--reset-author")
+        else:
+            run_git("commit", "-m", GIT_COMMIT_MESSAGE)
+        git_push(branch, lease=squash_commit)
+        logger.info("Changes successfully committed and pushed to remote." + (" (squashed)" if squash_commit else ""))
     except subprocess.CalledProcessError as e:
-        logger.error("Error executing Git command:", e)
+        logger.error(f"Error executing Git command: {e.cmd}: {e.stderr}")
         raise
 
 #######################################################################################
 
-organisations = {
-    "ufc": {
-        "scrape_function": scrape_ufc,
-        "ical_file": "ufc_events.ics",
-        "ical_name": "UFC Events"
-    },
-    "glory": {
-        "scrape_function": scrape_glory,
-        "ical_file": "glory_events.ics",
-        "ical_name": "Glory Events"
-    },
-    "one": {
-        "scrape_function": fetch_and_convert_one_ics_to_json,
-        "ical_file": "https://calendar.onefc.com/ONE-Championship-events.ics",
-        "ical_name": "One Champtionship Events"
-    }
-}
+def run_pipeline(org_name, org_data):
+    logger.info(f'Scraping {org_data["ical_name"]}...')
+    with timed(f"pipeline.{org_name}"):
+        events = org_data["scrape_function"]()
+        if org_data["scraper"].generates_calendar:
+            update_calendar(events, org_data["ical_file"], org_data["ical_name"])
 
-def debug():
-    fetch_and_convert_one_ics_to_json()
+def run_pipelines(orgs, max_workers=None, timeout=None):
+    """
+    Runs the scrape and calendar pipeline of every organisation concurrently.
 
-if __name__ == '__main__':
-    git_pull()
-    logger.info("Starting scraping...")
-    for org_name, org_data in organisations.items():
+    Pipelines run in daemon threads, so a pipeline exceeding its timeout is abandoned
+    instead of blocking the run. The timeout of a pipeline starts when it is started,
+    not when it is queued.
+
+    Args:
+        orgs (dict): Organisations to scrape, e.g. `organisations`
+        max_workers (int): Maximum number of pipelines running at the same time
+        timeout (float): Maximum runtime of a single pipeline in seconds
+
+    Returns:
+        dict: Status per organisation ("success", "error" or "timeout")
+    """
+    max_workers = max(1, max_workers or scrape_concurrency)
+    timeout = timeout or scrape_timeout
+
+    results = {}
+    pending = list(orgs.items())
+    running = {}
+
+    def worker(org_name, org_data):
         try:
-            logger.info(f'Scraping {org_data["ical_name"]}...')
-            update_calendar(org_data["scrape_function"](), org_data["ical_file"], org_data["ical_name"])
+            run_pipeline(org_name, org_data)
+            results.setdefault(org_name, "success")
         except Exception as e:
             logger.error(f"Error updating calendar for {org_name}: {e}")
-    git_add_files("ics/**/*.ics")
-    git_add_files("json/**/*.json")
+            results.setdefault(org_name, "error")
+
+    while pending or running:
+        while pending and len(running) < max_workers:
+            org_name, org_data = pending.pop(0)
+            thread = threading.Thread(target=worker, args=(org_name, org_data), name=f"scrape-{org_name}", daemon=True)
+            thread.start()
+            running[org_name] = (thread, time.monotonic())
+
+        for org_name, (thread, started) in list(running.items()):
+            thread.join(timeout=0.1)
+            if not thread.is_alive():
+                del running[org_name]
+            elif time.monotonic() - started > timeout:
+                logger.error(f"Timeout after {timeout}s while scraping {org_name}, pipeline abandoned.")
+                results.setdefault(org_name, "timeout")
+                abandoned_pipelines[org_name] = thread
+                del running[org_name]
+
+    return results
+
+def get_abandoned_pipelines(wait=0):
+    """
+    Returns the names of the abandoned pipelines, which are still running, after waiting up to `wait` seconds for them.
+    """
+    deadline = time.monotonic() + wait
+    for org_name, thread in list(abandoned_pipelines.items()):
+        thread.join(timeout=max(0, deadline - time.monotonic()))
+        if not thread.is_alive():
+            del abandoned_pipelines[org_name]
+    return set(abandoned_pipelines)
+
+def get_pipeline_paths(org_data):
+    """
+    Returns the pathspecs of the published files the pipeline of an organisation writes.
+    """
+    paths = [f"json/*/{org_data['scraper'].filename}"]
+    if org_data["scraper"].generates_calendar:
+        paths.append(f"ics/{org_data['ical_file']}")
+    return paths
+
+def get_next_event_start(filename, now):
+    """
+    Returns the start of the next upcoming or running event of a file in the store, None if there is none.
+    """
+    with event_store_lock:
+        rows = get_event_store().execute("SELECT data FROM events WHERE filename = ? AND removed = 0 AND date >= ?",
+                                         (filename, (now - timedelta(days=1)).date().isoformat())).fetchall()
+    starts = []
+    for row in rows:
+        event = CombatEvent.from_json(json.loads(row[0]))
+        start, end = event.main_card.start or event.date, event.main_card.end or event.date
+        if as_aware(end) >= now:
+            starts.append(as_aware(start))
+    return min(starts, default=None)
+
+def get_poll_interval(org_data, changed=False, failures=0):
+    """
+    Returns the seconds until the next scrape of an organisation, with jitter.
+
+    Organisations are polled every `daemon_min_interval` seconds around fight night and more
+    rarely the further away their next event is. Changed events halve the interval, failed
+    pipelines back off exponentially from `daemon_min_interval` up to `daemon_max_interval`.
+    """
+    now = datetime.now(timezone.utc)
+    if failures:
+        interval = min(daemon_max_interval, daemon_min_interval * 2 ** failures)
+    else:
+        next_start = get_next_event_start(org_data["scraper"].filename, now)
+        interval = daemon_max_interval
+        if next_start is not None:
+            until = (next_start - now).total_seconds()
+            interval = next((step_interval for step_until, step_interval in POLL_STEPS if until <= step_until), daemon_max_interval)
+        if changed:
+            interval = max(daemon_min_interval, interval / 2)
+    return interval * random.uniform(1 - daemon_jitter, 1 + daemon_jitter)
+
+def publish_run(results, started):
+    """
+    Writes the change feed and the static api, commits and pushes the changed files and writes the run report.
+    The files of pipelines, which were abandoned and are still running, are published by a later run.
+    """
+    running = get_abandoned_pipelines(wait=scrape_abandon_wait)
+    if running:
+        logger.error(f"Abandoned pipelines of {', '.join(sorted(running))} are still running, their files are not published.")
+    write_change_feed()
+    write_api_bundles()
+    git_stage_changes(exclude=[path for org_name in running for path in get_pipeline_paths(organisations[org_name])])
     git_commit_and_push()
+    write_run_report(results, started)
+
+def run_daemon(orgs):
+    """
+    Scrapes the organisations in a resident loop, every organisation on its own schedule (see `get_poll_interval`).
+    HTTP connections and webdrivers stay alive between cycles. SIGINT and SIGTERM finish the
+    running cycle and publish its results before the daemon exits.
+    """
+    stop = threading.Event()
+
+    def request_stop(signum, frame):
+        logger.info(f"Received signal {signum}, stopping after the current cycle...")
+        stop.set()
+
+    signal.signal(signal.SIGINT, request_stop)
+    signal.signal(signal.SIGTERM, request_stop)
+
+    next_runs = {org_name: time.monotonic() for org_name in orgs}
+    failures = dict.fromkeys(orgs, 0)
+    logger.info(f"Daemon started for {', '.join(orgs)}.")
+    while not stop.is_set():
+        now = time.monotonic()
+        due = {org_name: org_data for org_name, org_data in orgs.items() if next_runs[org_name] <= now}
+        # a pipeline abandoned after its timeout may still be running, its scraper must not run twice at the same time
+        for org_name in get_abandoned_pipelines() & set(due):
+            logger.error(f"Abandoned pipeline of {org_name} is still running, postponing the next scrape.")
+            next_runs[org_name] = now + daemon_min_interval
+            del due[org_name]
+        if not due:
+            stop.wait(min(next_runs.values()) - now)
+            continue
+
+        started = time.time()
+        reset_metrics()
+        results = run_pipelines(due)
+        with change_feed_lock:
+            changed_files = {change["file"] for change in change_feed if change["type"] != "added"}
+        try:
+            publish_run(results, started)
+        except Exception as e:
+            logger.error(f"Error publishing the results of the cycle: {e}")
+
+        for org_name, org_data in due.items():
+            failures[org_name] = 0 if results.get(org_name) == "success" else failures[org_name] + 1
+            interval = get_poll_interval(org_data, changed=org_data["scraper"].filename in changed_files, failures=failures[org_name])
+            next_runs[org_name] = time.monotonic() + interval
+            logger.info(f"Next scrape of {org_name} in {interval / 60:.0f} minutes.")
+
+    page_cache.save()
+    driver_pool.shutdown()
+    logger.info("Daemon stopped.")
+
+def write_run_report(results, started):
+    """
+    Writes timings, counters and pipeline results of the run to `run_report_file`
+    and, if METRICS_TEXTFILE is set, in the Prometheus textfile format.
+    """
+    finished = time.time()
+    with metrics_lock:
+        stages = {stage: dict(timing) for stage, timing in sorted(stage_timings.items())}
+        run_counters = dict(sorted(counters.items()))
+    report = {
+        "started": datetime.fromtimestamp(started, tz=timezone.utc).isoformat(),
+        "finished": datetime.fromtimestamp(finished, tz=timezone.utc).isoformat(),
+        "duration": finished - started,
+        "results": results,
+        "stages": stages,
+        "counters": run_counters,
+        "date_parsing": get_date_parse_stats(),
+    }
+    os.makedirs(os.path.dirname(run_report_file), exist_ok=True)
+    with open(run_report_file, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    if metrics_textfile:
+        lines = [
+            "# TYPE scraper_run_duration_seconds gauge",
+            f"scraper_run_duration_seconds {report['duration']:.6f}",
+            "# TYPE scraper_last_run_timestamp_seconds gauge",
+            f"scraper_last_run_timestamp_seconds {finished:.0f}",
+            "# TYPE scraper_pipeline_success gauge",
+        ]
+        lines += [f'scraper_pipeline_success{{organisation="{org}"}} {int(status == "success")}' for org, status in results.items()]
+        lines += ["# TYPE scraper_stage_seconds_total counter"]
+        lines += [f'scraper_stage_seconds_total{{stage="{stage}"}} {timing["total"]:.6f}' for stage, timing in stages.items()]
+        lines += ["# TYPE scraper_stage_calls_total counter"]
+        lines += [f'scraper_stage_calls_total{{stage="{stage}"}} {timing["count"]}' for stage, timing in stages.items()]
+        lines += ["# TYPE scraper_counter_total counter"]
+        lines += [f'scraper_counter_total{{name="{name}"}} {value}' for name, value in run_counters.items()]
+        tmp_path = metrics_textfile + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, metrics_textfile)
+    return report
+
+def debug():
+    organisations["one"]["scrape_function"]()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Scrapes combat sports events into json and ics files.")
+    parser.add_argument("--daemon", action="store_true", help="keep running and scrape every organisation on its own schedule")
+    parser.add_argument("--serve-feeds", action="store_true", help="serve filtered calendars on FEED_HOST:FEED_PORT")
+    args = parser.parse_args()
+
+    started = time.time()
+    feed_server = start_feed_server() if args.serve_feeds else None
+    if args.daemon:
+        git_pull()
+        run_daemon(organisations)
+    elif feed_server:
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+    else:
+        git_pull()
+        logger.info("Starting scraping...")
+        results = run_pipelines(organisations)
+        logger.info(f"Scraping finished: {results}")
+        logger.info(f"Date parsing: {get_date_parse_stats()}")
+        publish_run(results, started)
+    if feed_server:
+        feed_server.shutdown()
     # debug()
\ No newline at end of file
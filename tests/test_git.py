@@ -0,0 +1,155 @@
+"""
+Tests of the git publication (sync, staging, commit and push) against a temporary bare remote.
+
+Run with:
+    python -m unittest discover tests
+"""
+import importlib
+import locale
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+main = None
+
+
+def setUpModule():
+    global main, work_dir
+    try:
+        locale.setlocale(locale.LC_TIME, "en_US.UTF-8")
+    except locale.Error:
+        raise unittest.SkipTest("locale en_US.UTF-8 is not available")
+    # main.py writes its log relative to the working directory on import
+    work_dir = tempfile.TemporaryDirectory(prefix="scraper-git-test-")
+    os.chdir(work_dir.name)
+    sys.path.insert(0, repo_dir)
+    main = importlib.import_module("main")
+
+
+def tearDownModule():
+    os.chdir(repo_dir)
+    work_dir.cleanup()
+
+
+def git(cwd, *args):
+    return subprocess.run(["git", *args], cwd=cwd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True).stdout
+
+
+def write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+
+
+class GitPublishTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory(prefix="scraper-git-")
+        self.remote = os.path.join(self.tmp.name, "remote.git")
+        self.work = os.path.join(self.tmp.name, "work")
+        self.other = os.path.join(self.tmp.name, "other")
+        git(self.tmp.name, "init", "--quiet", "--bare", "--initial-branch=main", self.remote)
+
+        seed = os.path.join(self.tmp.name, "seed")
+        git(self.tmp.name, "init", "--quiet", "--initial-branch=main", seed)
+        self.configure(seed)
+        write(os.path.join(seed, "json", "2024", "ufc.json"), "[]\n")
+        write(os.path.join(seed, "main.py"), "\n")
+        git(seed, "add", "--all")
+        git(seed, "commit", "--quiet", "-m", "initial")
+        git(seed, "push", "--quiet", self.remote, "main")
+
+        for clone in (self.work, self.other):
+            git(self.tmp.name, "clone", "--quiet", self.remote, clone)
+            self.configure(clone)
+
+        self.settings = {name: getattr(main, name) for name in ("repo_url", "git_branch", "git_squash_window")}
+        main.repo_url = self.remote
+        main.git_branch = "main"
+        main.git_squash_window = 0
+        self.cwd = os.getcwd()
+        os.chdir(self.work)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        for name, value in self.settings.items():
+            setattr(main, name, value)
+        self.tmp.cleanup()
+
+    def configure(self, path):
+        git(path, "config", "user.name", "Test")
+        git(path, "config", "user.email", "test@example.com")
+
+    def publish(self, path, content):
+        write(os.path.join(self.work, path), content)
+        main.git_stage_changes()
+        main.git_commit_and_push()
+
+    def push_from_other(self, path, content):
+        git(self.other, "pull", "--quiet")
+        write(os.path.join(self.other, path), content)
+        git(self.other, "add", "--all")
+        git(self.other, "commit", "--quiet", "-m", "other")
+        git(self.other, "push", "--quiet", "origin", "main")
+
+    def remote_files(self):
+        return set(git(self.remote, "ls-tree", "-r", "--name-only", "main").split())
+
+    def remote_commits(self):
+        return git(self.remote, "log", "--format=%s", "main").split("\n")[:-1]
+
+    def test_rejected_push_keeps_unpublished_commits(self):
+        # run 1 commits, but its push fails
+        main.repo_url = os.path.join(self.tmp.name, "missing.git")
+        with self.assertRaises(subprocess.CalledProcessError):
+            self.publish("json/2024/x.json", "x\n")
+        main.repo_url = self.remote
+
+        self.push_from_other("json/2024/y.json", "y\n")
+        # unstaged file of a pipeline, which was abandoned and is still running
+        write(os.path.join(self.work, "json", "2024", "ufc.json"), "[1]\n")
+        write(os.path.join(self.work, "json", "2024", "z.json"), "z\n")
+        main.git_stage_changes(exclude=["json/*/ufc.json"])
+        main.git_commit_and_push()
+
+        self.assertTrue({"json/2024/x.json", "json/2024/y.json", "json/2024/z.json"} <= self.remote_files())
+        self.assertTrue(os.path.exists(os.path.join(self.work, "json", "2024", "x.json")))
+        self.assertEqual(git(self.remote, "show", "main:json/2024/ufc.json"), "[]\n")
+        with open(os.path.join(self.work, "json", "2024", "ufc.json"), encoding="utf-8") as f:
+            self.assertEqual(f.read(), "[1]\n")
+        self.assertEqual(git(self.work, "rev-parse", "HEAD"), git(self.remote, "rev-parse", "main"))
+
+    def test_squash_amends_published_commit(self):
+        main.git_squash_window = 3600
+        self.publish("json/2024/x.json", "x\n")
+        self.publish("json/2024/y.json", "y\n")
+        self.assertEqual(self.remote_commits(), [main.GIT_COMMIT_MESSAGE, "initial"])
+        self.assertTrue({"json/2024/x.json", "json/2024/y.json"} <= self.remote_files())
+
+        # the lease of the amended commit is stale, the changes are published as a new commit on top
+        self.push_from_other("json/2024/other.json", "other\n")
+        self.publish("json/2024/z.json", "z\n")
+        self.assertEqual(self.remote_commits(), [main.GIT_COMMIT_MESSAGE, "other", main.GIT_COMMIT_MESSAGE, "initial"])
+        self.assertTrue({"json/2024/x.json", "json/2024/y.json", "json/2024/z.json", "json/2024/other.json"} <= self.remote_files())
+        self.assertEqual(git(self.remote, "show", "--name-only", "--format=", "main").split(), ["json/2024/z.json"])
+
+    def test_stage_changes_with_renames_and_excludes(self):
+        write(os.path.join(self.work, "json", "2024", "glory.json"), "[]\n")
+        git(self.work, "add", "--all")
+        git(self.work, "commit", "--quiet", "-m", "glory")
+        git(self.work, "mv", "json/2024/glory.json", "json/2024/glory_events.json")
+        write(os.path.join(self.work, "json", "2024", "ufc.json"), "[1]\n")
+        write(os.path.join(self.work, "json", "2025", "one.json"), "[]\n")
+        write(os.path.join(self.work, "main.py"), "# changed\n")
+
+        staged = main.git_stage_changes(exclude=["json/*/ufc.json"])
+
+        self.assertEqual(set(staged), {"json/2024/glory_events.json", "json/2025/one.json"})
+        status = git(self.work, "diff", "--cached", "--name-status").splitlines()
+        self.assertEqual(sorted(status), ["A\tjson/2025/one.json", "R100\tjson/2024/glory.json\tjson/2024/glory_events.json"])
+
+
+if __name__ == "__main__":
+    unittest.main()